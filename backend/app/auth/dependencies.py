@@ -2,7 +2,7 @@
 Authentication dependencies and middleware for FastAPI routes
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List
@@ -18,13 +18,16 @@ security = HTTPBearer()
 
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Get current authenticated user from JWT token
+    The user id is left on request.state for request logging
     
     Args:
+        request: Incoming request
         credentials: Bearer token credentials
         db: Database session
         
@@ -62,6 +65,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    request.state.user_id = user.id
     return user
 
 
@@ -56,6 +56,11 @@ class Settings(BaseSettings):
     fireworks_base_url: str = "https://api.fireworks.ai/inference/v1"
     deepinfra_base_url: str = "https://api.deepinfra.com/v1/openai"
 
+    # Redis Configuration (Optional - enables AI search response caching)
+    redis_url: Optional[str] = None
+    # Serve near-duplicate AI search queries (responses and extracted criteria) from per-worker embedding-similarity caches
+    ai_search_semantic_cache: bool = False
+
     # Email/SMTP Configuration (Optional - for email verification)
     smtp_host: Optional[str] = None
     smtp_port: Optional[int] = None
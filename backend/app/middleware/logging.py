@@ -59,6 +59,9 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         try:
             response = await call_next(request)
             
+            # get_current_user leaves the authenticated user's id on request.state
+            user_id = getattr(request.state, 'user_id', user_id)
+            
             # Calculate duration
             duration = time.time() - start_time
             
@@ -2,7 +2,7 @@
 Item model for marketplace listings
 """
 
-from sqlalchemy import Column, String, Text, Float, Boolean, ForeignKey, Enum, TypeDecorator
+from sqlalchemy import Column, String, Text, Float, Boolean, ForeignKey, Enum, Index, TypeDecorator
 from .base import BaseModel
 from ..enums.item import ItemCondition, ItemStatus, ItemCategory
 
@@ -57,6 +57,10 @@ class ItemStatusType(TypeDecorator):
 
 class Item(BaseModel):
     __tablename__ = "items"
+    __table_args__ = (
+        # Keyset pagination for the admin listing (WHERE status = ? AND id > ? ORDER BY id)
+        Index("ix_items_status_id", "status", "id"),
+    )
 
     title = Column(String(200), nullable=False, index=True)
     description = Column(Text, nullable=False)
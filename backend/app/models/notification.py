@@ -2,7 +2,7 @@
 Notification model for user notifications
 """
 
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, Boolean, DateTime, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import BaseModel
@@ -18,6 +18,13 @@ class NotificationType(str, enum.Enum):
 
 class Notification(BaseModel):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination of a user's notifications, newest first, on the unique (created_at, id) cursor
+        Index("ix_notifications_user_created_at_id", "user_id", text("created_at DESC"), text("id DESC")),
+        # Unread counts and mark-as-read updates only touch the user's unread slice
+        Index("ix_notif_user_unread", "user_id", text("created_at DESC"), postgresql_where=text("is_read = false")),
+        Index("ix_notif_user_conv_unread", "user_id", "related_conversation_id", postgresql_where=text("is_read = false")),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     type = Column(Enum(NotificationType), nullable=False, default=NotificationType.MESSAGE)
@@ -2,7 +2,8 @@
 Admin routes for moderation and management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import List, Dict, Any
@@ -18,9 +19,15 @@ from ..auth.jwt_handler import get_password_hash
 from ..schemas.auth import AdminPasswordReset, AdminSecurityAnswerVerify, AdminSecurityAnswerUpdate
 from ..enums.user import UserRole
 from ..enums.item import ItemStatus
+from ..utils.s3_client import normalize_s3_urls
+from ..utils.ai_search import clear_semantic_caches
+from ..utils.search_cache import invalidate_search_cache
 
 router = APIRouter()
 
+# Validates ORM rows and writes JSON in a single pydantic-core pass
+_user_list_adapter = TypeAdapter(List[UserResponse])
+
 
 def require_admin(current_user: User = Depends(get_current_user)):
     """
@@ -40,7 +47,10 @@ def get_all_users(
     """
     Get all users (admin only)
     """
-    return db.query(User).all()
+    users = normalize_s3_urls(db.query(User).all(), "profile_picture_url")
+    users = _user_list_adapter.validate_python(users, from_attributes=True)
+    # Returning a Response skips FastAPI's re-serialization; the model still documents the shape
+    return Response(content=_user_list_adapter.dump_json(users), media_type="application/json")
 
 
 @router.put("/users/{user_id}/deactivate")
@@ -111,6 +121,8 @@ def delete_user(
     # Delete user (cascade will handle related items if configured)
     db.delete(user)
     db.commit()
+    # Their listings are gone, so cached AI search results may no longer be valid
+    invalidate_search_cache()
     
     return {"message": f"User {user.username} has been deleted"}
 
@@ -125,6 +137,7 @@ def get_sellers(
     """
     # Get users who have at least one item
     sellers = db.query(User).join(Item, User.id == Item.seller_id).distinct().all()
+    normalize_s3_urls(sellers, "profile_picture_url")
     
     # Get listing count for each seller
     seller_data = []
@@ -143,6 +156,16 @@ def get_sellers(
     return seller_data
 
 
+@router.post("/semantic-cache/clear")
+def clear_semantic_cache(admin_user: User = Depends(require_admin)):
+    """
+    Flush cached query and item embeddings used by AI search (admin only)
+    Only clears the worker that handles this request
+    """
+    clear_semantic_caches()
+    return {"message": "Semantic search cache cleared"}
+
+
 @router.get("/stats")
 def get_admin_stats(
     admin_user: User = Depends(require_admin),
@@ -413,6 +436,7 @@ def get_reported_items(
                         }
                         has_changes = True
             
+            normalize_s3_urls([item], "item_url")
             result.append({
                 "report_id": report.id,
                 "item": ItemResponse.from_orm(item).dict(),
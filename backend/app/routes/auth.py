@@ -2,7 +2,7 @@
 Enhanced authentication routes with JWT token management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from datetime import timedelta
@@ -30,6 +30,7 @@ from ..middleware.logging import DatabaseLoggingMiddleware
 from .chat import active_connections
 from ..utils.verification import store_verification_code, verify_code, is_email_verified, remove_verification_code
 from ..utils.email import generate_verification_code, send_verification_email
+from ..utils.s3_client import normalize_s3_urls
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -189,6 +190,7 @@ def signup(user_data: UserCreate, request: Request, db: Session = Depends(get_db
             success=True
         )
         
+        normalize_s3_urls([db_user], "profile_picture_url")
         return db_user
     
     except HTTPException:
@@ -430,6 +432,7 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
     Get current user information
     """
+    normalize_s3_urls([current_user], "profile_picture_url")
     return current_user
 
 
@@ -735,10 +738,21 @@ def admin_login_step2(
         )
 
 
+def _deliver_verification_email(email: str, code: str) -> None:
+    """Send the verification email after the response has gone out"""
+    email_sent = send_verification_email(email, code)
+    if not email_sent:
+        # If email sending failed but SMTP is not configured, still allow in dev mode
+        logger.warning(f"Verification email not sent to {email}, but code generated: {code}")
+        # In production, you might want to raise an error here
+        # For now, we'll allow it to continue (code is logged)
+
+
 @router.post("/send-verification-code")
 def send_verification_code(
     request_data: SendVerificationCodeRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -761,16 +775,10 @@ def send_verification_code(
         # Store verification code
         store_verification_code(email, code)
         
-        # Send verification email
-        email_sent = send_verification_email(email, code)
-        
-        if not email_sent:
-            # If email sending failed but SMTP is not configured, still allow in dev mode
-            logger.warning(f"Verification email not sent to {email}, but code generated: {code}")
-            # In production, you might want to raise an error here
-            # For now, we'll allow it to continue (code is logged)
+        # Send verification email once the response is flushed, so the request never waits on SMTP
+        background_tasks.add_task(_deliver_verification_email, email, code)
         
-        logger.info(f"Verification code sent to {email}")
+        logger.info(f"Verification code queued for {email}")
         
         return {
             "message": "Verification code sent to your email",
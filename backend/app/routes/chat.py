@@ -3,8 +3,8 @@ Chat routes for messaging between users
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import or_, and_, func
 from typing import List, Dict, Optional
 import logging
 import json
@@ -20,6 +20,8 @@ from ..models.rating import Rating
 from ..auth.dependencies import get_current_user
 from ..core.logging import get_logger
 from ..config import settings
+from ..utils.search_cache import invalidate_search_cache
+from ..utils.s3_client import normalize_s3_urls
 from ..schemas.chat import MessageCreate, MessageResponse, ConversationResponse, ConversationCreate
 from ..schemas.transaction import (
     TransactionCreate,
@@ -354,7 +356,37 @@ def get_conversations(
         )
     )
     
-    conversations = query.order_by(Conversation.last_message_at.desc().nullslast(), Conversation.created_at.desc()).all()
+    # Participants and transactions come in with the conversations instead of one query per row
+    conversations = query.options(
+        selectinload(Conversation.user1),
+        selectinload(Conversation.user2),
+        selectinload(Conversation.transaction),
+    ).order_by(Conversation.last_message_at.desc().nullslast(), Conversation.created_at.desc()).all()
+    
+    conversation_ids = [conv.id for conv in conversations]
+    
+    # Unread counts for every conversation in one grouped query
+    unread_counts = dict(
+        db.query(Message.conversation_id, func.count(Message.id))
+        .filter(
+            Message.conversation_id.in_(conversation_ids),
+            Message.sender_id != current_user.id,
+            Message.is_read == False
+        )
+        .group_by(Message.conversation_id)
+        .all()
+    ) if conversation_ids else {}
+    
+    # Latest message (and its sender) per conversation in one DISTINCT ON query
+    last_messages = {
+        message.conversation_id: message
+        for message in db.query(Message)
+        .options(joinedload(Message.sender))
+        .filter(Message.conversation_id.in_(conversation_ids))
+        .distinct(Message.conversation_id)
+        .order_by(Message.conversation_id, Message.created_at.desc())
+        .all()
+    } if conversation_ids else {}
     
     result = []
     for conv in conversations:
@@ -369,28 +401,17 @@ def get_conversations(
         if user_status == "deleted" or (user_status == "archived" and not include_archived):
             continue
             
-        other_user_id = conv.user2_id if conv.user1_id == current_user.id else conv.user1_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
-        other_user_id = conv.user2_id if conv.user1_id == current_user.id else conv.user1_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
-        
-        # Get unread count
-        unread_count = db.query(Message).filter(
-            and_(
-                Message.conversation_id == conv.id,
-                Message.sender_id != current_user.id,
-                Message.is_read == False
-            )
-        ).count()
+        if conv.user1_id == current_user.id:
+            other_user_id, other_user = conv.user2_id, conv.user2
+        else:
+            other_user_id, other_user = conv.user1_id, conv.user1
         
-        # Get last message
-        last_message = db.query(Message).filter(
-            Message.conversation_id == conv.id
-        ).order_by(Message.created_at.desc()).first()
+        unread_count = unread_counts.get(conv.id, 0)
+        last_message = last_messages.get(conv.id)
         
         last_message_response = None
         if last_message:
-            sender = db.query(User).filter(User.id == last_message.sender_id).first()
+            sender = last_message.sender
             last_message_response = MessageResponse(
                 id=last_message.id,
                 conversation_id=last_message.conversation_id,
@@ -414,9 +435,8 @@ def get_conversations(
         transaction_data = None
         if hasattr(conv, 'transaction_id') and conv.transaction_id:
             transaction_id = conv.transaction_id
-            transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-            if transaction:
-                transaction_data = serialize_transaction(transaction)
+            if conv.transaction:
+                transaction_data = serialize_transaction(conv.transaction)
         
         pending_price = None
         if hasattr(conv, 'pending_offer_price') and conv.pending_offer_price:
@@ -450,7 +470,7 @@ def get_conversations(
             pending_offer_at=getattr(conv, 'pending_offer_at', None)
         ))
     
-    return result
+    return normalize_s3_urls(result, "other_user_profile_picture_url")
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
@@ -1005,6 +1025,7 @@ async def respond_to_offer(
         conversation.last_message_at = datetime.utcnow()
         
         db.commit()
+        invalidate_search_cache()
         db.refresh(transaction)
         transaction_response = serialize_transaction(transaction)
         
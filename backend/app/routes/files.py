@@ -3,12 +3,14 @@ File upload routes using S3
 """
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 from ..database import get_db
 from ..auth.dependencies import get_current_user
 from ..models.user import User
 from ..utils.storage import get_file_storage
+from ..utils.search_cache import invalidate_search_cache
 
 router = APIRouter(tags=["File Management"])
 
@@ -114,6 +116,9 @@ async def delete_file(
         success = await storage.delete_file(s3_url)
         
         if success:
+            if "listings/" in s3_url:
+                # Cached AI search results may still point at this listing image
+                await run_in_threadpool(invalidate_search_cache)
             return {
                 "success": True,
                 "message": "File deleted successfully",
@@ -2,9 +2,14 @@
 Item management routes for marketplace listings with role-based access
 """
 
+import hashlib
 import logging
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from functools import lru_cache
+import msgspec
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text, or_
 from typing import List, Optional
@@ -13,17 +18,156 @@ from ..database import get_db
 from ..models.item import Item
 from ..models.user import User
 from ..models.item_report import ItemReport
-from ..schemas.item import ItemCreate, ItemUpdate, ItemResponse, ItemFilter, AISearchRequest, ItemReportCreate
+from ..schemas.item import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemFilter, AISearchRequest, ItemReportCreate, encode_item_list,
+    iter_item_ndjson, AISearchCriteriaStruct, encode_header_json
+)
 from ..auth.dependencies import (
     get_current_active_user, require_admin
 )
 from ..enums.item import ItemStatus, ItemCategory, ItemCondition
 from ..enums.user import UserRole
-from ..utils.ai_search import extract_search_criteria, find_similar_items_by_semantics
+from ..utils.ai_search import extract_search_criteria_cached_async, find_similar_items_by_semantics
+from ..utils.search_cache import (
+    get_cached_search, set_cached_search, invalidate_search_cache,
+    get_semantically_cached_search, set_semantically_cached_search
+)
+from ..utils.s3_client import normalize_s3_urls
+from .chat import send_notification_via_websocket
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Public catalog reads may be cached briefly by browsers/CDNs and revalidated via ETag
+PUBLIC_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+
+# Re-ranking fewer results than this is not worth the embedding calls
+SEMANTIC_RERANK_MIN_ITEMS = 4
+
+# When an AI search finds nothing in the requested condition, retry with these related conditions:
+# "used" items can be like_new, good, fair, or poor (anything except new);
+# "new" items can be new or like_new
+_USED_CONDITIONS = (ItemCondition.LIKE_NEW, ItemCondition.GOOD, ItemCondition.FAIR, ItemCondition.POOR)
+_NEW_CONDITIONS = (ItemCondition.NEW, ItemCondition.LIKE_NEW)
+CONDITION_RELAXATIONS = {
+    "good": _USED_CONDITIONS,  # Used items - include like_new too
+    "fair": _USED_CONDITIONS,
+    "poor": _USED_CONDITIONS,
+    "new": _NEW_CONDITIONS,  # New items
+    "like_new": _NEW_CONDITIONS,
+}
+
+# AI search clients that send this Accept type get results streamed one item per line
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Field-by-field diff between a report's item_snapshot and the item's current state
+REPORT_CHANGES_SQL = text("""
+    SELECT COALESCE((
+        SELECT jsonb_object_agg(snap.key, jsonb_build_object('old', snap.value, 'new', cur.state -> snap.key))
+        FROM jsonb_each(COALESCE(r.item_snapshot::jsonb, '{}'::jsonb)) AS snap
+        WHERE snap.value IS DISTINCT FROM cur.state -> snap.key
+    ), '{}'::jsonb) AS changes
+    FROM item_reports r
+    JOIN items i ON i.id = r.item_id
+    CROSS JOIN LATERAL (
+        SELECT jsonb_build_object(
+            'title', i.title,
+            'description', i.description,
+            'price', i.price::float8,
+            'condition', lower(i.condition::text),
+            'category', lower(i.category::text),
+            'location', i.location,
+            'is_negotiable', i.is_negotiable,
+            'item_url', i.item_url,
+            'status', lower(i.status::text)
+        ) AS state
+    ) AS cur
+    WHERE r.id = :report_id
+""")
+
+def _apply_cache_headers(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Attach ETag/Cache-Control headers for a public read.
+    Returns a 304 response when the client already holds the current version.
+    """
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _product_name_set(product_names) -> frozenset:
+    """Lowercase, strip and dedupe extracted product names once, right after extraction"""
+    return frozenset(name.strip().lower() for name in (product_names or []) if name and name.strip())
+
+
+def _normalize_product_names(product_name_set: frozenset) -> List[str]:
+    """
+    Reduce normalized product names to the minimal list needed for ILIKE matching.
+    A name containing a shorter kept name is dropped, since '%iphone%' already
+    matches everything '%iphone 13%' would.
+    """
+    names = sorted(product_name_set, key=lambda name: (len(name), name))
+    kept = []
+    for name in names:
+        if not any(shorter in name for shorter in kept):
+            kept.append(name)
+    return kept
+
+
+def _product_or(product_names: List[str]):
+    """Build a single OR clause matching any product name in title or description"""
+    if not product_names:
+        return None
+    return or_(*[
+        or_(Item.title.ilike(f"%{name}%"), Item.description.ilike(f"%{name}%"))
+        for name in product_names
+    ])
+
+
+def _is_literal_query(query_text: str, product_name_set: frozenset) -> bool:
+    """Quoted text, single words and bare product names are lookups, not descriptions worth re-ranking by meaning"""
+    return (
+        '"' in query_text
+        or len(query_text.split()) <= 1
+        or query_text.lower() in product_name_set
+    )
+
+
+@lru_cache(maxsize=64)
+def _parse_condition(value: str) -> Optional[ItemCondition]:
+    """Parse an extracted condition once per distinct value; None if the LLM returned an unknown one"""
+    try:
+        return ItemCondition(value)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _parse_category(value: str) -> Optional[ItemCategory]:
+    """Parse an extracted category once per distinct value; None if the LLM returned an unknown one"""
+    try:
+        return ItemCategory(value)
+    except ValueError:
+        return None
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _cached_search_response(request: Request, cached: dict) -> Response:
+    """Replay a cached AI search response as a JSON array or NDJSON, whichever the client asked for"""
+    if _wants_ndjson(request):
+        rows = msgspec.json.decode(cached["content"], type=List[msgspec.Raw])
+        return Response(
+            content=b"".join(bytes(row) + b"\n" for row in rows),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=cached["headers"]
+        )
+    return Response(content=cached["content"], media_type="application/json", headers=cached["headers"])
+
 
 @router.post("/", response_model=ItemResponse)
 def create_item(
@@ -35,7 +179,7 @@ def create_item(
     Create a new marketplace item (any authenticated user)
     """
     try:
-        item_dict = item_data.dict()
+        item_dict = item_data.model_dump()
         # Ensure status is set to AVAILABLE if not provided
         if 'status' not in item_dict:
             item_dict['status'] = ItemStatus.AVAILABLE
@@ -47,7 +191,9 @@ def create_item(
         )
         db.add(db_item)
         db.commit()
+        invalidate_search_cache()
         db.refresh(db_item)
+        normalize_s3_urls([db_item], "item_url")
         return db_item
     except Exception as e:
         db.rollback()
@@ -59,6 +205,8 @@ def create_item(
 
 @router.get("/", response_model=List[ItemResponse])
 def get_items(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     category: Optional[ItemCategory] = None,
@@ -104,7 +252,17 @@ def get_items(
         )
     
     items = query.offset(skip).limit(limit).all()
-    return items
+
+    # ETag covers exactly the rows on this page, so validating it costs no extra query
+    page_version = hashlib.blake2b(digest_size=8)
+    for item in items:
+        last_modified = item.updated_at or item.created_at
+        page_version.update(f"{item.id}:{last_modified.timestamp() if last_modified else 0};".encode())
+    not_modified = _apply_cache_headers(request, response, f'W/"{len(items)}-{page_version.hexdigest()}"')
+    if not_modified:
+        return not_modified
+    
+    return normalize_s3_urls(items, "item_url")
 
 
 @router.get("/my-items", response_model=List[ItemResponse])
@@ -127,11 +285,11 @@ def get_my_items(
         # Default: exclude removed items
         query = query.filter(Item.status != ItemStatus.REMOVED)
     
-    return query.all()
+    return normalize_s3_urls(query.all(), "item_url")
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
+def get_item(item_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get item by ID (public endpoint)
     Returns 404 if item is removed
@@ -140,7 +298,12 @@ def get_item(item_id: int, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
+    last_modified = item.updated_at or item.created_at
+    not_modified = _apply_cache_headers(request, response, f'W/"{item.id}-{int(last_modified.timestamp())}"')
+    if not_modified:
+        return not_modified
     
+    normalize_s3_urls([item], "item_url")
     return item
 
 
@@ -166,12 +329,14 @@ def update_item(
         )
     
     # Update fields
-    for field, value in item_update.dict(exclude_unset=True).items():
+    for field, value in item_update.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
     
     item.updated_by = current_user.username
     db.commit()
+    invalidate_search_cache()
     db.refresh(item)
+    normalize_s3_urls([item], "item_url")
     return item
 
 
@@ -198,6 +363,7 @@ def mark_item_sold(
     item.status = ItemStatus.SOLD
     item.updated_by = current_user.username
     db.commit()
+    invalidate_search_cache()
     return {"message": "Item marked as sold"}
 
 
@@ -205,6 +371,7 @@ def mark_item_sold(
 def mark_item_incomplete(
     item_id: int,
     report_data: ItemReportCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -282,10 +449,6 @@ def mark_item_incomplete(
     
     # Send WebSocket notification to seller (NOT the reporter)
     try:
-        from ..routes.chat import send_notification_via_websocket
-        from datetime import datetime
-        import anyio
-        
         # IMPORTANT: Send notification to the SELLER (item.seller_id), not the reporter (current_user.id)
         seller_id = item.seller_id
         logger.info(f"Sending item report notification to seller {seller_id} for item {item_id} (reported by user {current_user.id})")
@@ -299,24 +462,12 @@ def mark_item_incomplete(
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        # Send notification asynchronously (if in async context, use asyncio)
-        try:
-            # Wrap notification data in the expected format
-            wrapped_notification = {
-                "type": "item_reported",
-                "data": notification_data
-            }
-            # Send to SELLER, not reporter
-            anyio.from_thread.run(send_notification_via_websocket, seller_id, wrapped_notification)
-        except RuntimeError:
-            # If we're already in async context, schedule directly
-            import asyncio
-            wrapped_notification = {
-                "type": "item_reported",
-                "data": notification_data
-            }
-            # Send to SELLER, not reporter
-            asyncio.create_task(send_notification_via_websocket(seller_id, wrapped_notification))
+        wrapped_notification = {
+            "type": "item_reported",
+            "data": notification_data
+        }
+        # Send to SELLER, not reporter; delivered on the event loop after the response goes out
+        background_tasks.add_task(send_notification_via_websocket, seller_id, wrapped_notification)
     except Exception as e:
         logger.warning(f"Failed to send WebSocket notification to seller {item.seller_id}: {e}")
     
@@ -344,34 +495,12 @@ def resolve_item_report(
             detail="Not authorized to resolve this report"
         )
     
-    # Get current item state
-    item = db.query(Item).filter(Item.id == report.item_id).first()
-    if not item:
+    # Diff the stored snapshot against the item's current state in a single query.
+    # Enum columns are stored by name (e.g. 'LIKE_NEW'), so lower() matches the snapshot's values.
+    diff_row = db.execute(REPORT_CHANGES_SQL, {"report_id": report.id}).first()
+    if not diff_row:
         raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Compare current item state with snapshot
-    current_state = {
-        "title": item.title,
-        "description": item.description,
-        "price": float(item.price),
-        "condition": item.condition.value if hasattr(item.condition, 'value') else str(item.condition),
-        "category": item.category.value if hasattr(item.category, 'value') else str(item.category),
-        "location": item.location,
-        "is_negotiable": item.is_negotiable,
-        "item_url": item.item_url,
-        "status": item.status.value if hasattr(item.status, 'value') else str(item.status),
-    }
-    
-    # Calculate changes
-    changes = {}
-    if report.item_snapshot:
-        for key, old_value in report.item_snapshot.items():
-            new_value = current_state.get(key)
-            if old_value != new_value:
-                changes[key] = {
-                    "old": old_value,
-                    "new": new_value
-                }
+    changes = diff_row.changes or {}
     
     # Seller acknowledges the report - DO NOT mark as resolved
     # Only admin can mark as fixed after reviewing changes
@@ -423,8 +552,6 @@ def mark_report_fixed(
     """
     Mark a report as fixed (admin only) - same as resolve but for admin
     """
-    from ..enums.user import UserRole
-    
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -446,14 +573,13 @@ def mark_report_fixed(
 @router.post("/reports/{report_id}/notify-seller")
 def notify_seller_about_report(
     report_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Send a notification to the seller about the report (admin only)
     """
-    from ..enums.user import UserRole
-    
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -470,9 +596,6 @@ def notify_seller_about_report(
     
     # Send WebSocket notification to seller
     try:
-        from ..routes.chat import send_notification_via_websocket
-        import anyio
-        
         notification_data = {
             "item_id": item.id,
             "item_title": item.title,
@@ -487,11 +610,7 @@ def notify_seller_about_report(
             "data": notification_data
         }
         
-        try:
-            anyio.from_thread.run(send_notification_via_websocket, item.seller_id, wrapped_notification)
-        except RuntimeError:
-            import asyncio
-            asyncio.create_task(send_notification_via_websocket(item.seller_id, wrapped_notification))
+        background_tasks.add_task(send_notification_via_websocket, item.seller_id, wrapped_notification)
         
         logger.info(f"Admin {current_user.id} sent notification to seller {item.seller_id} about report {report_id}")
     except Exception as e:
@@ -528,18 +647,21 @@ def delete_item(
         {"item_id": item_id, "updated_by": current_user.username}
     )
     db.commit()
+    invalidate_search_cache()
     
     return {"message": "Item deleted successfully"}
 
 
 @router.post("/ai-search")
-def ai_search_items(
+async def ai_search_items(
     search_request: AISearchRequest,
+    request: Request,
     db: Session = Depends(get_db),
 ):
     """
     AI-assisted natural language search for marketplace items.
     Public endpoint that supports optional semantic re-ranking.
+    Returns a JSON array, or newline-delimited JSON when the client accepts application/x-ndjson.
     """
     query_text = (search_request.query or "").strip()
     if not query_text:
@@ -547,21 +669,40 @@ def ai_search_items(
 
     context_dict = search_request.context.model_dump(exclude_none=True) if search_request.context else None
     
-    logger.info(f"=== AI SEARCH REQUEST ===")
-    logger.info(f"User Query: '{query_text}'")
-    logger.info(f"Context: {context_dict}")
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    if debug_enabled:
+        logger.debug("AI search request: query=%r context=%s", query_text, context_dict)
 
+    # Identical searches within the cache TTL skip the LLM call and DB queries entirely
+    cache_key, cached = await run_in_threadpool(
+        get_cached_search, query_text, context_dict, search_request.use_semantic_search
+    )
+    if cached is not None:
+        return _cached_search_response(request, cached)
+
+    # Rephrasings of a recent search reuse its response (opt-in, per worker)
+    query_vector, cached = await run_in_threadpool(
+        get_semantically_cached_search, query_text, context_dict, search_request.use_semantic_search
+    )
+    if cached is not None:
+        return _cached_search_response(request, cached)
+
+    # Only a semantic miss pays for the LLM call; it is awaited on the event loop instead of holding a threadpool worker
     try:
-        criteria = extract_search_criteria(query_text, context_dict)
+        criteria = await extract_search_criteria_cached_async(query_text, context_dict)
         extraction_method = criteria.get('extraction_method', 'Unknown')
-        logger.info(f"=== EXTRACTION RESULT ({extraction_method}) ===")
-        logger.info(f"Product Names: {criteria.get('product_names', [])}")
-        logger.info(f"Category: {criteria.get('category')}")
-        logger.info(f"Condition: {criteria.get('condition')}")
-        logger.info(f"Min Price: {criteria.get('min_price')}")
-        logger.info(f"Max Price: {criteria.get('max_price')}")
-        logger.info(f"Description: {criteria.get('description')}")
-        logger.info(f"Extraction Method: {extraction_method}")
+        if debug_enabled:
+            logger.debug(
+                "Extraction result (%s): product_names=%s category=%s condition=%s "
+                "min_price=%s max_price=%s description=%r",
+                extraction_method,
+                criteria.get('product_names', []),
+                criteria.get('category'),
+                criteria.get('condition'),
+                criteria.get('min_price'),
+                criteria.get('max_price'),
+                criteria.get('description'),
+            )
     except Exception as exc:
         logger.error(f"Failed to extract search criteria: {exc}", exc_info=True)
         raise HTTPException(
@@ -569,12 +710,28 @@ def ai_search_items(
             detail=f"Failed to process AI search query: {exc}",
         ) from exc
 
+    # Database queries and re-ranking are blocking, so they run in the threadpool
+    return await run_in_threadpool(
+        _run_ai_search, search_request, request, db, query_text, context_dict, criteria, cache_key, query_vector
+    )
+
+
+def _run_ai_search(
+    search_request: AISearchRequest,
+    request: Request,
+    db: Session,
+    query_text: str,
+    context_dict: Optional[dict],
+    criteria: dict,
+    cache_key: Optional[str],
+    query_vector,
+):
+    """Filter, relax and re-rank items for extracted search criteria and build the response"""
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
     base_query = db.query(Item).filter(Item.status != ItemStatus.REMOVED)
     # Show available/reserved items to end users
     base_query = base_query.filter(Item.status.in_([ItemStatus.AVAILABLE, ItemStatus.RESERVED]))
-    
-    logger.info(f"=== BASE QUERY FILTERS ===")
-    logger.info(f"Status filter: AVAILABLE or RESERVED")
 
     # Track which filters are applied
     category_filter_applied = False
@@ -582,125 +739,79 @@ def ai_search_items(
     price_filter_applied = False
     
     category_value = criteria.get("category")
-    if category_value:
-        try:
-            base_query = base_query.filter(Item.category == ItemCategory(category_value))
-            category_filter_applied = True
-            logger.info(f"Category filter applied: {category_value}")
-        except ValueError:
-            # Ignore invalid categories returned by AI
-            logger.warning(f"Invalid category value: {category_value}")
-            pass
-    else:
-        logger.info(f"No category filter applied")
+    category_enum = _parse_category(category_value) if category_value else None
+    if category_enum is not None:
+        base_query = base_query.filter(Item.category == category_enum)
+        category_filter_applied = True
+        logger.debug("Category filter applied: %s", category_value)
+    elif category_value:
+        # Ignore invalid categories returned by AI
+        logger.warning(f"Invalid category value: {category_value}")
 
     condition_value = criteria.get("condition")
-    if condition_value:
-        try:
-            condition_enum = ItemCondition(condition_value)
-            base_query = base_query.filter(Item.condition == condition_enum)
-            condition_filter_applied = True
-            logger.info(f"Condition filter applied: {condition_value}")
-        except ValueError:
-            logger.warning(f"Invalid condition value: {condition_value}")
-            pass
-    else:
-        logger.info(f"No condition filter applied")
+    condition_enum = _parse_condition(condition_value) if condition_value else None
+    if condition_enum is not None:
+        base_query = base_query.filter(Item.condition == condition_enum)
+        condition_filter_applied = True
+        logger.debug("Condition filter applied: %s", condition_value)
+    elif condition_value:
+        logger.warning(f"Invalid condition value: {condition_value}")
 
     min_price = criteria.get("min_price")
     max_price = criteria.get("max_price")
     if min_price is not None and max_price is not None and min_price > max_price:
         min_price, max_price = max_price, min_price
-        logger.info(f"Price range swapped: min={min_price}, max={max_price}")
+        logger.debug("Price range swapped: min=%s, max=%s", min_price, max_price)
     if min_price is not None:
         base_query = base_query.filter(Item.price >= min_price)
         price_filter_applied = True
-        logger.info(f"Min price filter applied: ${min_price}")
     if max_price is not None:
         base_query = base_query.filter(Item.price <= max_price)
         price_filter_applied = True
-        logger.info(f"Max price filter applied: ${max_price}")
-    if min_price is None and max_price is None:
-        logger.info(f"No price filter applied")
+    if price_filter_applied:
+        logger.debug("Price filter applied: min=%s, max=%s", min_price, max_price)
 
     # Get product names (with variations) from AI extraction
     # ChatGPT already corrected spelling and provided variations
-    product_names = criteria.get("product_names", [])
-    
-    logger.info(f"=== PRODUCT NAME SEARCH ===")
-    logger.info(f"Product names to search: {product_names}")
+    product_name_set = _product_name_set(criteria.get("product_names"))
+    product_names = _normalize_product_names(product_name_set)
+    product_filter = _product_or(product_names)
     
     # Build query with product name variations
     # Search for any of the product name variations in title or description
     product_query = base_query
-    if product_names:
-        # Create OR conditions for all product name variations
-        product_conditions = []
-        for product_name in product_names:
-            like_pattern = f"%{product_name}%"
-            product_conditions.append(
-                or_(Item.title.ilike(like_pattern), Item.description.ilike(like_pattern))
-            )
-            logger.info(f"  - Searching for: '{product_name}' (pattern: {like_pattern})")
-        
-        # Combine all conditions with OR (using sqlalchemy.or_)
-        if product_conditions:
-            from sqlalchemy import or_ as sql_or
-            product_query = product_query.filter(sql_or(*product_conditions))
-            logger.info(f"Applied product name filter with {len(product_conditions)} variations")
+    if product_filter is not None:
+        product_query = product_query.filter(product_filter)
+        logger.debug("Applied product name filter with %d variations: %s", len(product_names), product_names)
     else:
         # No product names - this is a category-only query
         # Return all items matching category/condition/price filters
         product_query = base_query
-        logger.info(f"No product names provided - this is a category-only query")
-
-    # Log the SQL query being constructed
-    logger.info(f"=== SQL QUERY CONSTRUCTION ===")
-    try:
-        # Try to compile the query to see what SQL will be executed
-        compiled = product_query.statement.compile(compile_kwargs={'literal_binds': False})
-        logger.info(f"Query SQL (compiled): {compiled}")
-    except Exception as e:
-        logger.info(f"Could not compile query for logging: {e}")
-        logger.info(f"Query filters applied: product_names={product_names}, category={category_value}, condition={condition_value}, price_range=[{min_price}, {max_price}]")
+        logger.debug("No product names provided - this is a category-only query")
 
     limit = 50
     items = product_query.order_by(Item.created_at.desc()).limit(limit).all()
     
-    logger.info(f"=== QUERY RESULTS (Initial) ===")
-    logger.info(f"Found {len(items)} items")
-    if items:
+    if debug_enabled:
+        logger.debug("Initial query found %d items", len(items))
         for idx, item in enumerate(items[:5]):  # Log first 5 items
-            logger.info(f"  [{idx+1}] ID: {item.id}, Title: '{item.title}', Category: {item.category}, Condition: {item.condition}, Price: ${item.price}")
+            logger.debug("  [%d] ID: %s, Title: %r, Category: %s, Condition: %s, Price: $%s",
+                         idx + 1, item.id, item.title, item.category, item.condition, item.price)
 
     # If no matches found and condition filter was applied, try relaxing the condition filter
     if len(items) == 0 and condition_filter_applied and condition_value and product_names:
-        logger.info(f"No items found with condition '{condition_value}'. Trying to relax condition filter...")
-        
-        # Map of condition to related conditions
-        # "used" items can be like_new, good, fair, or poor (anything except new)
-        # "new" items can be new or like_new
-        condition_relaxations = {
-            "good": ["like_new", "good", "fair", "poor"],  # Used items - include like_new too
-            "fair": ["like_new", "good", "fair", "poor"],
-            "poor": ["like_new", "good", "fair", "poor"],
-            "new": ["new", "like_new"],  # New items
-            "like_new": ["new", "like_new"]
-        }
+        logger.debug("No items found with condition %r. Trying to relax condition filter...", condition_value)
         
         # Try related conditions
-        related_conditions = condition_relaxations.get(condition_value, [])
+        related_conditions = CONDITION_RELAXATIONS.get(condition_value)
         if related_conditions:
             # Remove condition filter and try with related conditions
             base_query_no_condition = db.query(Item).filter(Item.status != ItemStatus.REMOVED)
             base_query_no_condition = base_query_no_condition.filter(Item.status.in_([ItemStatus.AVAILABLE, ItemStatus.RESERVED]))
             
             # Reapply other filters
-            if category_value:
-                try:
-                    base_query_no_condition = base_query_no_condition.filter(Item.category == ItemCategory(category_value))
-                except ValueError:
-                    pass
+            if category_enum is not None:
+                base_query_no_condition = base_query_no_condition.filter(Item.category == category_enum)
             
             if min_price is not None:
                 base_query_no_condition = base_query_no_condition.filter(Item.price >= min_price)
@@ -708,56 +819,39 @@ def ai_search_items(
                 base_query_no_condition = base_query_no_condition.filter(Item.price <= max_price)
             
             # Apply condition filter with related conditions
-            base_query_no_condition = base_query_no_condition.filter(Item.condition.in_([ItemCondition(c) for c in related_conditions]))
+            base_query_no_condition = base_query_no_condition.filter(Item.condition.in_(related_conditions))
             
             # Reapply product name search
-            if product_names:
-                product_conditions = []
-                for product_name in product_names:
-                    like_pattern = f"%{product_name}%"
-                    product_conditions.append(
-                        or_(Item.title.ilike(like_pattern), Item.description.ilike(like_pattern))
-                    )
-                if product_conditions:
-                    from sqlalchemy import or_ as sql_or
-                    base_query_no_condition = base_query_no_condition.filter(sql_or(*product_conditions))
+            base_query_no_condition = base_query_no_condition.filter(product_filter)
             
             items = base_query_no_condition.order_by(Item.created_at.desc()).limit(limit).all()
-            logger.info(f"After relaxing condition filter, found {len(items)} items")
-            if items:
+            if debug_enabled:
+                logger.debug("After relaxing condition filter, found %d items", len(items))
                 for idx, item in enumerate(items[:5]):
-                    logger.info(f"  [{idx+1}] ID: {item.id}, Title: '{item.title}', Condition: {item.condition}, Price: ${item.price}")
+                    logger.debug("  [%d] ID: %s, Title: %r, Condition: %s, Price: $%s",
+                                 idx + 1, item.id, item.title, item.condition, item.price)
 
     # Track which filters were relaxed
     filters_relaxed = []
     
     # If still no matches found but we have product names, try removing filters one by one
     if len(items) == 0 and product_names and (condition_filter_applied or price_filter_applied or category_filter_applied):
-        logger.info(f"No items found with all filters. Trying to relax filters and match by product name only...")
+        logger.debug("No items found with all filters. Trying to relax filters and match by product name only...")
         
         # Build query with just product name, no filters
         base_query_product_only = db.query(Item).filter(Item.status != ItemStatus.REMOVED)
         base_query_product_only = base_query_product_only.filter(Item.status.in_([ItemStatus.AVAILABLE, ItemStatus.RESERVED]))
         
         # Don't apply any filters - just product name match
-        # Apply product name search
-        if product_names:
-            product_conditions = []
-            for product_name in product_names:
-                like_pattern = f"%{product_name}%"
-                product_conditions.append(
-                    or_(Item.title.ilike(like_pattern), Item.description.ilike(like_pattern))
-                )
-            if product_conditions:
-                from sqlalchemy import or_ as sql_or
-                base_query_product_only = base_query_product_only.filter(sql_or(*product_conditions))
+        base_query_product_only = base_query_product_only.filter(product_filter)
         
         items = base_query_product_only.order_by(Item.created_at.desc()).limit(limit).all()
-        logger.info(f"After removing all filters, found {len(items)} items matching product name")
-        if items:
+        if debug_enabled:
+            logger.debug("After removing all filters, found %d items matching product name", len(items))
             for idx, item in enumerate(items[:5]):
-                logger.info(f"  [{idx+1}] ID: {item.id}, Title: '{item.title}', Category: {item.category}, Condition: {item.condition}, Price: ${item.price}")
-            
+                logger.debug("  [%d] ID: %s, Title: %r, Category: %s, Condition: %s, Price: $%s",
+                             idx + 1, item.id, item.title, item.category, item.condition, item.price)
+        if items:
             # Track which filters were relaxed
             if condition_filter_applied:
                 filters_relaxed.append("condition")
@@ -768,14 +862,21 @@ def ai_search_items(
 
     # If still no matches found but we have product names, return empty
     if len(items) == 0 and product_names:
-        logger.warning(f"No items found for product names: {product_names}. Returning empty results.")
-        return []
+        logger.debug("No items found for product names: %s. Returning empty results.", product_names)
 
     if not items:
+        set_cached_search(cache_key, "[]", {})
+        set_semantically_cached_search(query_vector, query_text, context_dict, search_request.use_semantic_search, "[]", {})
+        if _wants_ndjson(request):
+            return Response(content=b"", media_type=NDJSON_MEDIA_TYPE)
         return []
 
     # Optional semantic re-ranking
-    if search_request.use_semantic_search:
+    rerank = search_request.use_semantic_search
+    if rerank and (len(items) < SEMANTIC_RERANK_MIN_ITEMS or _is_literal_query(query_text, product_name_set)):
+        logger.debug("Semantic rerank bypassed (literal/small): %d items", len(items))
+        rerank = False
+    if rerank:
         serialized_items = [
             {
                 "id": item.id,
@@ -793,19 +894,16 @@ def ai_search_items(
         if semantic_ids:
             item_map = {item.id: item for item in items}
             ordered_items = [item_map[item_id] for item_id in semantic_ids if item_id in item_map]
-            ordered_items.extend([item for item in items if item.id not in semantic_ids])
+            # Items outside the top-k keep their original order after the re-ranked ones
+            if len(ordered_items) < len(items):
+                semantic_id_set = set(semantic_ids)
+                ordered_items.extend(item for item in items if item.id not in semantic_id_set)
             items = ordered_items
 
-    # Convert items to ItemResponse models for proper serialization
-    item_responses = [ItemResponse.model_validate(item) for item in items]
+    normalize_s3_urls(items, "item_url")
     
     # Build extracted criteria for response headers
-    from fastapi import Response
-    from fastapi.encoders import jsonable_encoder
-    from ..schemas.item import AISearchContext
-    import json
-    
-    extracted_criteria = AISearchContext(
+    extracted_criteria = AISearchCriteriaStruct(
         product_names=criteria.get("product_names", []),
         category=criteria.get("category"),
         condition=criteria.get("condition"),
@@ -817,58 +915,43 @@ def ai_search_items(
     filters_not_matched = []
     
     if len(items) > 0:
-        # Check if condition filter was matched
-        if condition_filter_applied and condition_value:
-            requested_condition = ItemCondition(condition_value)
-            items_with_condition = [item for item in items if item.condition == requested_condition]
-            if len(items_with_condition) == 0:
-                filters_not_matched.append("condition")
-                logger.info(f"Condition filter not matched - found {len(items)} items but none with condition '{condition_value}'")
+        # Count matches for every applied filter in a single pass over the results
+        requested_condition = condition_enum if condition_filter_applied else None
+        requested_category = category_enum if category_filter_applied else None
+        condition_matches = price_matches = category_matches = 0
+        for item in items:
+            if requested_condition is not None and item.condition == requested_condition:
+                condition_matches += 1
+            if price_filter_applied and (min_price is None or item.price >= min_price) and (max_price is None or item.price <= max_price):
+                price_matches += 1
+            if requested_category is not None and item.category == requested_category:
+                category_matches += 1
         
-        # Check if price filter was matched
-        if price_filter_applied:
-            items_within_price = []
-            for item in items:
-                price_match = True
-                if min_price is not None and item.price < min_price:
-                    price_match = False
-                if max_price is not None and item.price > max_price:
-                    price_match = False
-                if price_match:
-                    items_within_price.append(item)
-            if len(items_within_price) == 0:
-                filters_not_matched.append("price")
-                logger.info(f"Price filter not matched - found {len(items)} items but none within price range")
-        
-        # Check if category filter was matched
-        if category_filter_applied and category_value:
-            try:
-                requested_category = ItemCategory(category_value)
-                items_with_category = [item for item in items if item.category == requested_category]
-                if len(items_with_category) == 0:
-                    filters_not_matched.append("category")
-                    logger.info(f"Category filter not matched - found {len(items)} items but none in category '{category_value}'")
-            except ValueError:
-                pass
+        if requested_condition is not None and condition_matches == 0:
+            filters_not_matched.append("condition")
+            logger.debug("Condition filter not matched - found %d items but none with condition %r", len(items), condition_value)
+        if price_filter_applied and price_matches == 0:
+            filters_not_matched.append("price")
+            logger.debug("Price filter not matched - found %d items but none within price range", len(items))
+        if requested_category is not None and category_matches == 0:
+            filters_not_matched.append("category")
+            logger.debug("Category filter not matched - found %d items but none in category %r", len(items), category_value)
     
     # If filters were relaxed (removed to find items), add them to not_matched
     if filters_relaxed:
         filters_not_matched.extend([f for f in filters_relaxed if f not in filters_not_matched])
     
-    # Serialize items to JSON
-    item_dicts = jsonable_encoder(item_responses)
-    
     # Return JSON response with extracted criteria in headers
     # Get extraction method from criteria
     extraction_method = criteria.get('extraction_method', 'Unknown')
     
     # Use Response with proper JSON serialization
     response_headers = {
-        "X-Extracted-Criteria": json.dumps(extracted_criteria.model_dump(exclude_none=True)),
+        "X-Extracted-Criteria": encode_header_json(extracted_criteria),
         "X-Extraction-Method": extraction_method
     }
     if filters_not_matched:
-        response_headers["X-Filters-Relaxed"] = json.dumps(filters_not_matched)
+        response_headers["X-Filters-Relaxed"] = encode_header_json(filters_not_matched)
         if "condition" in filters_not_matched and condition_value:
             response_headers["X-Requested-Condition"] = condition_value
         if "price" in filters_not_matched:
@@ -878,23 +961,37 @@ def ai_search_items(
             if max_price is not None:
                 price_info["max_price"] = max_price
             if price_info:
-                response_headers["X-Requested-Price"] = json.dumps(price_info)
+                response_headers["X-Requested-Price"] = encode_header_json(price_info)
         if "category" in filters_not_matched and category_value:
             response_headers["X-Requested-Category"] = category_value
     
-    response = Response(
-        content=json.dumps(item_dicts),
-        media_type="application/json",
-        headers=response_headers
-    )
+    def cache_results(content_str: str):
+        set_cached_search(cache_key, content_str, response_headers)
+        set_semantically_cached_search(
+            query_vector, query_text, context_dict, search_request.use_semantic_search, content_str, response_headers
+        )
+    
+    if _wants_ndjson(request):
+        def stream_items():
+            # Headers go out first; each item is flushed as soon as it is encoded and then dropped
+            yield from iter_item_ndjson(items)
+            # The cache keeps the JSON array form; encoding it once the stream is done keeps
+            # encoded lines from accumulating while the client is still reading
+            cache_results(encode_item_list(items).decode())
+        
+        return StreamingResponse(stream_items(), media_type=NDJSON_MEDIA_TYPE, headers=response_headers)
+    
+    # Rows go through the precompiled msgspec encoder; no Pydantic validation pass per item
+    content = encode_item_list(items)
+    cache_results(content.decode())
     
-    return response
+    return Response(content=content, media_type="application/json", headers=response_headers)
 
 
 # Admin-only routes
 @router.get("/admin/all", response_model=List[ItemResponse])
 def get_all_items_admin(
-    skip: int = 0,
+    after_id: Optional[int] = None,
     limit: int = 100,
     status: Optional[ItemStatus] = None,
     admin_user: User = Depends(require_admin),
@@ -902,11 +999,19 @@ def get_all_items_admin(
 ):
     """
     Get all items including removed ones (admin only)
+    Paginate by passing the last item id of the previous page as after_id
     """
     query = db.query(Item)
     if status:
         query = query.filter(Item.status == status)
-    
-    return query.offset(skip).limit(limit).all()
+    if after_id:
+        query = query.filter(Item.id > after_id)
+    
+    items = normalize_s3_urls(query.order_by(Item.id).limit(limit).all(), "item_url")
+    # Returning a Response skips response_model validation; the model still documents the shape
+    return Response(
+        content=encode_item_list(items),
+        media_type="application/json"
+    )
 
 
@@ -2,45 +2,74 @@
 Notification routes for user notifications
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select, tuple_, update
 from typing import List, Optional
 from datetime import datetime
 
 from ..database import get_db
 from ..models.notification import Notification
 from ..auth.dependencies import get_current_user
-from ..schemas.notification import NotificationResponse, NotificationUpdate
+from ..schemas.notification import NotificationResponse, NotificationUpdate, encode_notification_list
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[NotificationResponse])
 def get_notifications(
-    skip: int = Query(0, ge=0),
+    before_created_at: Optional[datetime] = Query(None),
+    before_id: Optional[int] = Query(None),
     limit: int = Query(50, ge=1, le=100),
     unread_only: bool = Query(False),
     current_user: Optional[object] = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get notifications for the current user"""
+    """
+    Get notifications for the current user, newest first
+    Paginate by passing the created_at and id of the last notification of the previous page
+    as before_created_at and before_id (created_at alone is not unique, so ties would be skipped)
+    """
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
     
     if unread_only:
         query = query.filter(Notification.is_read == False)
+    if before_created_at and before_id is not None:
+        query = query.filter(tuple_(Notification.created_at, Notification.id) < tuple_(before_created_at, before_id))
+    elif before_created_at:
+        query = query.filter(Notification.created_at < before_created_at)
     
-    notifications = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit).all()
+    # Unread total rides along with the page as a scalar subquery, saving the client a second request
+    unread_count_subquery = (
+        select(func.count(Notification.id))
+        .where(Notification.user_id == current_user.id, Notification.is_read == False)
+        .scalar_subquery()
+    )
+    rows = query.add_columns(unread_count_subquery).order_by(desc(Notification.created_at), desc(Notification.id)).limit(limit).all()
+    notifications = [row[0] for row in rows]
+    if rows:
+        unread_count = rows[0][1]
+    elif before_created_at:
+        # Past the last page; unread notifications may still exist on earlier pages
+        unread_count = db.query(unread_count_subquery).scalar()
+    else:
+        # An empty first page means the user has no (unread) notifications at all
+        unread_count = 0
     
-    return notifications
+    # Returning a Response skips response_model validation; the model still documents the shape
+    return Response(
+        content=encode_notification_list(notifications),
+        media_type="application/json",
+        headers={"X-Unread-Count": str(unread_count)}
+    )
 
 
-@router.get("/unread-count")
+@router.get("/unread-count", deprecated=True)
 def get_unread_count(
     current_user: Optional[object] = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get count of unread notifications"""
+    """Get count of unread notifications (also returned as X-Unread-Count by the list endpoint)"""
     count = db.query(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read == False
@@ -56,10 +85,13 @@ def mark_notification_read(
     db: Session = Depends(get_db)
 ):
     """Mark a notification as read"""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    # Single UPDATE ... RETURNING instead of select, update and refresh
+    notification = db.execute(
+        update(Notification)
+        .where(Notification.id == notification_id, Notification.user_id == current_user.id)
+        .values(is_read=True, read_at=func.now())
+        .returning(Notification)
+    ).scalar_one_or_none()
     
     if not notification:
         raise HTTPException(
@@ -67,12 +99,11 @@ def mark_notification_read(
             detail="Notification not found"
         )
     
-    notification.is_read = True
-    notification.read_at = datetime.utcnow()
+    # Serialize before commit so the expired instance is not reloaded
+    response = NotificationResponse.model_validate(notification)
     db.commit()
-    db.refresh(notification)
     
-    return notification
+    return response
 
 
 @router.put("/read-all")
@@ -86,8 +117,8 @@ def mark_all_notifications_read(
         Notification.is_read == False
     ).update({
         "is_read": True,
-        "read_at": datetime.utcnow()
-    })
+        "read_at": func.now()
+    }, synchronize_session=False)
     
     db.commit()
     
@@ -107,8 +138,8 @@ def mark_conversation_notifications_read(
         Notification.is_read == False
     ).update({
         "is_read": True,
-        "read_at": datetime.utcnow()
-    })
+        "read_at": func.now()
+    }, synchronize_session=False)
     
     db.commit()
     
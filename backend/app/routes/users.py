@@ -2,7 +2,8 @@
 User management routes with role-based access control
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -13,9 +14,13 @@ from ..auth.dependencies import (
     get_current_user, require_admin, get_current_active_user
 )
 from ..enums.user import UserRole
+from ..utils.s3_client import normalize_s3_urls
 
 router = APIRouter()
 
+# Validates ORM rows and writes JSON in a single pydantic-core pass
+_user_list_adapter = TypeAdapter(List[UserResponse])
+
 
 @router.get("/", response_model=List[UserResponse])
 def get_users(
@@ -27,8 +32,10 @@ def get_users(
     """
     Get all users (admin only)
     """
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    users = normalize_s3_urls(db.query(User).offset(skip).limit(limit).all(), "profile_picture_url")
+    users = _user_list_adapter.validate_python(users, from_attributes=True)
+    # Returning a Response skips FastAPI's re-serialization; the model still documents the shape
+    return Response(content=_user_list_adapter.dump_json(users), media_type="application/json")
 
 
 @router.get("/profile", response_model=UserResponse)
@@ -36,6 +43,7 @@ def get_profile(current_user: User = Depends(get_current_active_user)):
     """
     Get current user profile
     """
+    normalize_s3_urls([current_user], "profile_picture_url")
     return current_user
 
 
@@ -60,6 +68,7 @@ def update_profile(
     current_user.updated_by = current_user.username
     db.commit()
     db.refresh(current_user)
+    normalize_s3_urls([current_user], "profile_picture_url")
     return current_user
 
 
@@ -83,6 +92,7 @@ def get_user(
             detail="Not authorized to view this user"
         )
     
+    normalize_s3_urls([user], "profile_picture_url")
     return user
 
 
@@ -111,6 +121,7 @@ def update_user(
     user.updated_by = admin_user.username
     db.commit()
     db.refresh(user)
+    normalize_s3_urls([user], "profile_picture_url")
     
     return user
 
@@ -2,7 +2,7 @@
 Chat schemas for request/response validation
 """
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from .transaction import TransactionResponse
@@ -50,19 +50,6 @@ class ConversationResponse(BaseModel):
     pending_offer_from_user_id: Optional[int] = None
     pending_offer_at: Optional[datetime] = None
 
-    @model_validator(mode='after')
-    def normalize_urls(self):
-        """Normalize other_user_profile_picture_url to proper S3 URL if it's a relative path"""
-        if self.other_user_profile_picture_url:
-            try:
-                from ..utils.s3_client import get_s3_client
-                s3_client = get_s3_client()
-                self.other_user_profile_picture_url = s3_client.get_s3_url(self.other_user_profile_picture_url)
-            except Exception:
-                # If S3 client is not available, keep original URL
-                pass
-        return self
-
     class Config:
         from_attributes = True
 
@@ -2,13 +2,16 @@
 Item schemas for request/response models
 """
 
-from pydantic import BaseModel, Field, model_validator
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from ..enums.item import ItemCondition, ItemStatus, ItemCategory
 
 
 class ItemCreate(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     title: str
     description: str
     price: float
@@ -20,6 +23,8 @@ class ItemCreate(BaseModel):
 
 
 class ItemUpdate(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     title: Optional[str] = None
     description: Optional[str] = None
     price: Optional[float] = None
@@ -32,6 +37,8 @@ class ItemUpdate(BaseModel):
 
 
 class ItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     id: int
     title: str
     description: str
@@ -48,29 +55,75 @@ class ItemResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    @model_validator(mode='after')
-    def normalize_urls(self):
-        """Normalize item_url to proper S3 URL if it's a relative path"""
-        if self.item_url:
-            try:
-                from ..utils.s3_client import get_s3_client
-                s3_client = get_s3_client()
-                self.item_url = s3_client.get_s3_url(self.item_url)
-            except Exception:
-                # If S3 client is not available, keep original URL
-                pass
-        return self
 
-    class Config:
-        from_attributes = True
+class ItemResponseStruct(msgspec.Struct, kw_only=True):
+    """
+    msgspec mirror of ItemResponse for list endpoints.
+    Built straight from ORM rows without validation; ItemResponse stays the documented schema.
+    """
+    id: int
+    title: str
+    description: str
+    price: float
+    condition: ItemCondition
+    status: ItemStatus
+    category: ItemCategory
+    location: Optional[str]
+    is_negotiable: bool
+    item_url: Optional[str]
+    seller_id: int
+    created_by: Optional[str]
+    updated_by: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+def item_struct_from_orm(item) -> ItemResponseStruct:
+    """Copy an Item row into an ItemResponseStruct (item_url is expected to be normalized already)"""
+    return ItemResponseStruct(
+        id=item.id,
+        title=item.title,
+        description=item.description,
+        price=item.price,
+        condition=item.condition,
+        status=item.status,
+        category=item.category,
+        location=item.location,
+        is_negotiable=item.is_negotiable,
+        item_url=item.item_url,
+        seller_id=item.seller_id,
+        created_by=item.created_by,
+        updated_by=item.updated_by,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+    )
+
+
+# Built once at import; reused for every list response
+_item_list_encoder = msgspec.json.Encoder()
+
+
+def encode_item_list(items) -> bytes:
+    """Serialize Item rows straight to a JSON array"""
+    return _item_list_encoder.encode([item_struct_from_orm(item) for item in items])
+
+
+def iter_item_ndjson(items):
+    """Yield Item rows as newline-delimited JSON, encoding one row at a time"""
+    for item in items:
+        yield _item_list_encoder.encode(item_struct_from_orm(item)) + b"\n"
 
 
 class ItemReportCreate(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     report_type: str  # "incomplete_info", "no_photos", "inappropriate", "other"
     description: Optional[str] = None  # Required for "other" type
 
 
 class ItemReportResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     report_id: int
     item_id: int
     reported_by_user_id: Optional[int]
@@ -84,12 +137,11 @@ class ItemReportResponse(BaseModel):
     item_snapshot: Optional[dict]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
-
 
 class ItemFilter(BaseModel):
     """Filter parameters for item search"""
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     category: Optional[ItemCategory] = None
     condition: Optional[ItemCondition] = None
     status: Optional[ItemStatus] = None
@@ -101,6 +153,8 @@ class ItemFilter(BaseModel):
 
 
 class AISearchContext(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     product_names: Optional[List[str]] = None  # Changed from keywords to product_names
     category: Optional[str] = None
     condition: Optional[str] = None
@@ -108,7 +162,26 @@ class AISearchContext(BaseModel):
     max_price: Optional[float] = None
 
 
+class AISearchCriteriaStruct(msgspec.Struct, omit_defaults=True):
+    """msgspec mirror of AISearchContext for the X-Extracted-Criteria response header"""
+    product_names: Optional[List[str]] = None
+    category: Optional[str] = None
+    condition: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+
+_header_encoder = msgspec.json.Encoder()
+
+
+def encode_header_json(value) -> str:
+    """Encode a struct, list or dict as compact JSON for a response header"""
+    return _header_encoder.encode(value).decode()
+
+
 class AISearchRequest(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     query: str = Field(..., min_length=1, description="Natural language search query")
     context: Optional[AISearchContext] = None
     use_semantic_search: bool = False
@@ -116,5 +189,7 @@ class AISearchRequest(BaseModel):
 
 class AISearchResponse(BaseModel):
     """Response model for AI search that includes both items and extracted criteria"""
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     items: List[ItemResponse]
     extracted_criteria: AISearchContext  # The criteria that was used for this search
\ No newline at end of file
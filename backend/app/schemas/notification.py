@@ -2,6 +2,7 @@
 Notification schemas for request/response validation
 """
 
+import msgspec
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
@@ -25,6 +26,47 @@ class NotificationResponse(BaseModel):
         from_attributes = True
 
 
+class NotificationResponseStruct(msgspec.Struct, kw_only=True):
+    """msgspec mirror of NotificationResponse for list endpoints"""
+    id: int
+    user_id: int
+    type: NotificationType
+    title: str
+    message: str
+    is_read: bool
+    read_at: Optional[datetime] = None
+    related_item_id: Optional[int] = None
+    related_user_id: Optional[int] = None
+    related_conversation_id: Optional[int] = None
+    created_at: datetime
+
+
+def notification_struct_from_orm(notification) -> NotificationResponseStruct:
+    """Copy a Notification row into a NotificationResponseStruct"""
+    return NotificationResponseStruct(
+        id=notification.id,
+        user_id=notification.user_id,
+        type=notification.type,
+        title=notification.title,
+        message=notification.message,
+        is_read=notification.is_read,
+        read_at=notification.read_at,
+        related_item_id=notification.related_item_id,
+        related_user_id=notification.related_user_id,
+        related_conversation_id=notification.related_conversation_id,
+        created_at=notification.created_at,
+    )
+
+
+# Built once at import; reused for every list response
+_notification_list_encoder = msgspec.json.Encoder()
+
+
+def encode_notification_list(notifications) -> bytes:
+    """Serialize Notification rows straight to a JSON array"""
+    return _notification_list_encoder.encode([notification_struct_from_orm(n) for n in notifications])
+
+
 class NotificationUpdate(BaseModel):
     is_read: bool
 
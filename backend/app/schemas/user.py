@@ -2,7 +2,7 @@
 User schemas for request/response models
 """
 
-from pydantic import BaseModel, EmailStr, model_validator
+from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 from ..enums.user import UserRole
@@ -33,18 +33,5 @@ class UserResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    @model_validator(mode='after')
-    def normalize_urls(self):
-        """Normalize profile_picture_url to proper S3 URL if it's a relative path"""
-        if self.profile_picture_url:
-            try:
-                from ..utils.s3_client import get_s3_client
-                s3_client = get_s3_client()
-                self.profile_picture_url = s3_client.get_s3_url(self.profile_picture_url)
-            except Exception:
-                # If S3 client is not available, keep original URL
-                pass
-        return self
-
     class Config:
         from_attributes = True
\ No newline at end of file
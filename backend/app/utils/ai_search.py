@@ -2,151 +2,130 @@
 AI-powered search using OpenAI to extract search criteria from natural language
 """
 
-import json
+import asyncio
+import functools
+import hashlib
 import logging
 import re
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List
-from difflib import get_close_matches
-from openai import OpenAI, RateLimitError, APIError
+import numpy as np
+import orjson
+from openai import AsyncOpenAI, OpenAI, RateLimitError, APIError
+from rapidfuzz import fuzz, process
 from ..config import settings
 from ..enums.item import ItemCategory, ItemCondition
+from .semantic_cache import SemanticCache, l2_normalize
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
+# Initialize OpenAI clients
 _openai_client = None
+_openai_client_lock = threading.Lock()
+_async_openai_client = None
 
+# Per-process LRU of extracted criteria, keyed by normalized query + context
+EXTRACTION_CACHE_SIZE = 1024
+_extraction_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_extraction_cache_lock = threading.Lock()
 
-def map_category_name_to_enum(category_name: str) -> Optional[str]:
-    """
-    Map natural language category names to category enum values.
-    
-    Args:
-        category_name: Natural language category name (e.g., "sports equipment", "electronics")
-        
-    Returns:
-        Category enum value or None if no match
-    """
-    if not category_name:
-        return None
+# Paraphrases of a cached query reuse its criteria when their embeddings are this close
+EXTRACTION_SEMANTIC_THRESHOLD = 0.95
+EXTRACTION_SEMANTIC_TTL_SECONDS = 3600
+_extraction_semantic_cache = SemanticCache(
+    EXTRACTION_CACHE_SIZE, EXTRACTION_SEMANTIC_THRESHOLD, EXTRACTION_SEMANTIC_TTL_SECONDS
+)
+
+
+# Mapping of natural language to category enum values
+_CATEGORY_MAPPINGS = {
+    # Sports/Fitness
+    "sports": "sports_fitness",
+    "sport": "sports_fitness",
+    "sports equipment": "sports_fitness",
+    "sport equipment": "sports_fitness",
+    "fitness": "sports_fitness",
+    "fitness equipment": "sports_fitness",
+    "athletic": "sports_fitness",
+    "athletics": "sports_fitness",
+    "exercise": "sports_fitness",
+    "exercise equipment": "sports_fitness",
+    "gym": "sports_fitness",
+    "gym equipment": "sports_fitness",
+    "sports_fitness": "sports_fitness",
     
-    category_lower = category_name.lower().strip()
+    # Electronics
+    "electronics": "electronics",
+    "electronic": "electronics",
+    "tech": "electronics",
+    "technology": "electronics",
+    "device": "electronics",
+    "devices": "electronics",
+    "computer": "electronics",
+    "computers": "electronics",
+    "phone": "electronics",
+    "phones": "electronics",
+    "laptop": "electronics",
+    "laptops": "electronics",
+    "tablet": "electronics",
+    "tablets": "electronics",
     
-    # Mapping of natural language to category enum values
-    category_mappings = {
-        # Sports/Fitness
-        "sports": "sports_fitness",
-        "sport": "sports_fitness",
-        "sports equipment": "sports_fitness",
-        "sport equipment": "sports_fitness",
-        "fitness": "sports_fitness",
-        "fitness equipment": "sports_fitness",
-        "athletic": "sports_fitness",
-        "athletics": "sports_fitness",
-        "exercise": "sports_fitness",
-        "exercise equipment": "sports_fitness",
-        "gym": "sports_fitness",
-        "gym equipment": "sports_fitness",
-        "sports_fitness": "sports_fitness",
-        
-        # Electronics
-        "electronics": "electronics",
-        "electronic": "electronics",
-        "tech": "electronics",
-        "technology": "electronics",
-        "device": "electronics",
-        "devices": "electronics",
-        "computer": "electronics",
-        "computers": "electronics",
-        "phone": "electronics",
-        "phones": "electronics",
-        "laptop": "electronics",
-        "laptops": "electronics",
-        "tablet": "electronics",
-        "tablets": "electronics",
-        
-        # Textbooks
-        "textbook": "textbooks",
-        "textbooks": "textbooks",
-        "book": "textbooks",
-        "books": "textbooks",
-        "text book": "textbooks",
-        "text books": "textbooks",
-        
-        # Clothing
-        "clothing": "clothing",
-        "clothes": "clothing",
-        "apparel": "clothing",
-        "wear": "clothing",
-        "garment": "clothing",
-        "garments": "clothing",
-        
-        # Furniture
-        "furniture": "furniture",
-        "furnishings": "furniture",
-        "furnishing": "furniture",
-        "furniture item": "furniture",
-        "furniture items": "furniture",
-        
-        # Other
-        "other": "other",
-        "others": "other",
-        "misc": "other",
-        "miscellaneous": "other",
-    }
+    # Textbooks
+    "textbook": "textbooks",
+    "textbooks": "textbooks",
+    "book": "textbooks",
+    "books": "textbooks",
+    "text book": "textbooks",
+    "text books": "textbooks",
     
-    # Direct match
-    if category_lower in category_mappings:
-        return category_mappings[category_lower]
+    # Clothing
+    "clothing": "clothing",
+    "clothes": "clothing",
+    "apparel": "clothing",
+    "wear": "clothing",
+    "garment": "clothing",
+    "garments": "clothing",
     
-    # Partial match (e.g., "sports equipment" contains "sports")
-    for key, value in category_mappings.items():
-        if key in category_lower or category_lower in key:
-            return value
+    # Furniture
+    "furniture": "furniture",
+    "furnishings": "furniture",
+    "furnishing": "furniture",
+    "furniture item": "furniture",
+    "furniture items": "furniture",
     
-    return None
+    # Other
+    "other": "other",
+    "others": "other",
+    "misc": "other",
+    "miscellaneous": "other",
+}
 
+# Condition extraction patterns
+# Order matters: more specific patterns first
+_CONDITION_PATTERNS = (
+    (r'\blike\s*new\s*(?:condition)?\b', 'like_new'),  # "like new" or "like new condition"
+    (r'\balmost\s*new\s*(?:condition)?\b', 'like_new'),  # "almost new" or "almost new condition"
+    (r'\bnew\b', 'new'),
+    (r'\bgood\s*(?:condition)?\b', 'good'),
+    (r'\bfair\s*(?:condition)?\b', 'fair'),
+    (r'\bpoor\s*(?:condition)?\b', 'poor'),
+    (r'\bused\b', 'good'),  # Default used items to "good" condition
+    (r'\bsecond\s*hand\b', 'good'),
+)
 
-def correct_common_typos(keyword: str) -> str:
-    """
-    Correct common typos in keywords to improve search matching.
-    Returns the corrected keyword or the original if no correction found.
-    """
-    typo_corrections = {
-        # Tennis/racket typos
-        "tenis": "tennis",
-        "tennis": "tennis",
-        "rakcet": "racket",
-        "rakets": "racket",
-        "rackets": "racket",
-        "racket": "racket",
-        # Calculator typos
-        "callcullator": "calculator",
-        "calclator": "calculator",
-        "calcuator": "calculator",
-        "calc": "calculator",
-        "calculator": "calculator",
-        "calculators": "calculator",
-        # Other common typos
-        "laptp": "laptop",
-        "laptops": "laptop",
-        "laptop": "laptop",
-        "gloves": "glove",
-        "glove": "glove",
-        "glovs": "glove",
-        "textbook": "textbook",
-        "textbooks": "textbook",
-        "textbok": "textbook",
-        "phone": "phone",
-        "phones": "phone",
-        "fone": "phone",
-        "shoes": "shoe",
-        "shoe": "shoe",
-        "shos": "shoe",
-    }
-    
-    keyword_lower = keyword.lower().strip()
-    return typo_corrections.get(keyword_lower, keyword)
+# Every price and condition pattern in one alternation, so the query is scanned once
+_PRICE_CONDITION_RE = re.compile("|".join([
+    # "between 20 and 50"
+    r'(?P<between>between\s+\$?\s*(?P<between_min>\d+(?:\.\d+)?)\s+and\s+\$?\s*(?P<between_max>\d+(?:\.\d+)?))',
+    # "under 50", "below $50", "less than 50", "< 50"
+    r'(?P<under>(?:under|below|less\s+than|<)\s*\$?\s*(?P<under_value>\d+(?:\.\d+)?))',
+    # "over 100", "above 100", "more than 100", "> 100"
+    r'(?P<over>(?:over|above|more\s+than|>)\s*\$?\s*(?P<over_value>\d+(?:\.\d+)?))',
+    *(f'(?P<cond{priority}>{pattern})' for priority, (pattern, _) in enumerate(_CONDITION_PATTERNS)),
+]))
 
 
 def extract_price_and_condition(user_query: str) -> tuple:
@@ -154,65 +133,46 @@ def extract_price_and_condition(user_query: str) -> tuple:
     Extract price range and condition from natural language query using regex patterns.
     Returns: (min_price, max_price, condition)
     """
-    import re
-    
-    min_price = None
-    max_price = None
-    condition = None
-    
-    query_lower = user_query.lower()
-    
-    # Price extraction patterns
-    # "under 50", "below 50", "less than 50", "< 50"
-    under_pattern = r'(?:under|below|less\s+than|<\s*)(?:\$?\s*)?(\d+(?:\.\d+)?)'
-    under_match = re.search(under_pattern, query_lower)
-    if under_match:
-        max_price = float(under_match.group(1))
-    
-    # "over 100", "above 100", "more than 100", "> 100"
-    over_pattern = r'(?:over|above|more\s+than|>\s*)(?:\$?\s*)?(\d+(?:\.\d+)?)'
-    over_match = re.search(over_pattern, query_lower)
-    if over_match:
-        min_price = float(over_match.group(1))
-    
-    # "between 20 and 50"
-    between_pattern = r'between\s+(?:\$?\s*)?(\d+(?:\.\d+)?)\s+and\s+(?:\$?\s*)?(\d+(?:\.\d+)?)'
-    between_match = re.search(between_pattern, query_lower)
-    if between_match:
-        min_price = float(between_match.group(1))
-        max_price = float(between_match.group(2))
+    return _scan_price_and_condition(user_query.lower())
+
+
+def _scan_price_and_condition(query_lower: str) -> tuple:
+    """extract_price_and_condition for an already-lowercased query"""
+    under_price = over_price = between = None
+    condition_priority = None
     
-    # Condition extraction patterns
-    # Order matters: more specific patterns first
-    condition_patterns = {
-        r'\blike\s*new\s*(?:condition)?\b': 'like_new',  # "like new" or "like new condition"
-        r'\balmost\s*new\s*(?:condition)?\b': 'like_new',  # "almost new" or "almost new condition"
-        r'\bnew\b': 'new',
-        r'\bgood\s*(?:condition)?\b': 'good',
-        r'\bfair\s*(?:condition)?\b': 'fair',
-        r'\bpoor\s*(?:condition)?\b': 'poor',
-        r'\bused\b': 'good',  # Default used items to "good" condition
-        r'\bsecond\s*hand\b': 'good'
-    }
+    for match in _PRICE_CONDITION_RE.finditer(query_lower):
+        kind = match.lastgroup
+        if kind == "between":
+            if between is None:
+                between = (float(match.group("between_min")), float(match.group("between_max")))
+        elif kind == "under":
+            if under_price is None:
+                under_price = float(match.group("under_value"))
+        elif kind == "over":
+            if over_price is None:
+                over_price = float(match.group("over_value"))
+        else:
+            # Earlier patterns win regardless of where they appear in the query
+            priority = int(kind[4:])
+            if condition_priority is None or priority < condition_priority:
+                condition_priority = priority
     
-    for pattern, cond_value in condition_patterns.items():
-        if re.search(pattern, query_lower):
-            condition = cond_value
-            break
+    min_price, max_price = over_price, under_price
+    if between is not None:
+        min_price, max_price = between
+    condition = _CONDITION_PATTERNS[condition_priority][1] if condition_priority is not None else None
     
     return min_price, max_price, condition
 
 
-def get_openai_client() -> Optional[OpenAI]:
+def _llm_base_url() -> tuple:
     """
-    Get LLM client instance (supports OpenAI, Groq, Together, Fireworks, DeepInfra)
-    All providers use OpenAI-compatible API
+    Resolve the configured LLM provider and its OpenAI-compatible base URL.
+
+    Returns:
+        (provider, base_url) where base_url is None for OpenAI itself
     """
-    global _openai_client
-    if not settings.openai_api_key:
-        logger.warning("LLM API key not configured. AI search will not work.")
-        return None
-    
     provider = getattr(settings, 'llm_provider', 'groq').lower()
     
     # Map provider to base URL
@@ -224,9 +184,28 @@ def get_openai_client() -> Optional[OpenAI]:
         'deepinfra': getattr(settings, 'deepinfra_base_url', 'https://api.deepinfra.com/v1/openai'),
     }
     
-    base_url = base_urls.get(provider)
+    return provider, base_urls.get(provider)
+
+
+def get_openai_client() -> Optional[OpenAI]:
+    """
+    Get LLM client instance (supports OpenAI, Groq, Together, Fireworks, DeepInfra)
+    All providers use OpenAI-compatible API
+    """
+    global _openai_client
+    if _openai_client is not None:
+        return _openai_client
+    
+    if not settings.openai_api_key:
+        logger.warning("LLM API key not configured. AI search will not work.")
+        return None
+    
+    provider, base_url = _llm_base_url()
     
-    if _openai_client is None:
+    # Sync handlers run in the threadpool; build exactly one client (and connection pool)
+    with _openai_client_lock:
+        if _openai_client is not None:
+            return _openai_client
         if base_url:
             # Use custom base URL for alternative providers
             _openai_client = OpenAI(
@@ -248,105 +227,185 @@ def get_openai_client() -> Optional[OpenAI]:
     return _openai_client
 
 
-def extract_search_criteria(user_query: str, context: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+def get_async_openai_client() -> Optional[AsyncOpenAI]:
     """
-    Extract search criteria from natural language query using OpenAI.
-    ChatGPT will intelligently:
-    - Correct spelling errors automatically (e.g., "callcullator" → "calculator")
-    - Identify product names and suggest variations (e.g., ["calculator", "calc", "graphing calculator"])
-    - Detect category from static list
-    - Extract condition if mentioned
-    - Extract price range if mentioned
+    Get async LLM client instance for use from the event loop
+    Same provider and base URL resolution as get_openai_client
+    """
+    global _async_openai_client
+    if _async_openai_client is not None:
+        return _async_openai_client
     
-    Args:
-        user_query: Natural language description of what user wants
-        context: Optional previous search criteria to merge with new query
-        
+    if not settings.openai_api_key:
+        logger.warning("LLM API key not configured. AI search will not work.")
+        return None
+    
+    if _async_openai_client is None:
+        provider, base_url = _llm_base_url()
+        _async_openai_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=base_url,  # None falls back to api.openai.com
+            timeout=30.0,  # 30 second timeout
+            max_retries=2  # Limit retries to avoid long waits
+        )
+        logger.info(f"Initialized async {provider.upper()} client" + (f" with base URL: {base_url}" if base_url else ""))
+    
+    return _async_openai_client
+
+
+# Words that tie a follow-up query to the previous search ("cheaper ones", "like new")
+_REFERENCE_WORDS = frozenset({"ones", "those", "them", "it", "these", "that", "this", "like", "new", "used", "good", "fair", "poor"})
+_REFERENCE_RE = re.compile(r"\b(?:" + "|".join(sorted(_REFERENCE_WORDS)) + r")\b")
+# Words that only add condition/price filters without naming a product
+_FILTER_ONLY_KEYWORDS = frozenset({"like", "new", "used", "good", "fair", "poor", "condition",
+                                   "under", "below", "less", "than", "over", "above", "more",
+                                   "between", "dollar", "dollars", "$", "price", "cost"})
+_FILLER_WORDS = frozenset({"a", "an", "the", "in"})
+# Query tokens for the keyword sets above; trailing punctuation ("like new?") must not hide a keyword
+_QUERY_TOKEN_RE = re.compile(r"[\w$]+")
+
+
+def _merge_query_with_context(user_query: str, context: Optional[Dict[str, any]]) -> tuple:
+    """
+    Decide whether a follow-up query refines the previous search.
+
     Returns:
-        Dictionary with extracted search criteria:
-        {
-            "product_names": ["corrected_name", "variation1", "variation2"],  # Product name variations for DB search
-            "category": "electronics" | None,  # From static category list
-            "condition": "like_new" | None,  # If mentioned in query
-            "min_price": float | None,  # If mentioned in query
-            "max_price": float | None,  # If mentioned in query
-            "description": "cleaned description"
-        }
+        (merged_query, should_merge_context)
     """
-    # Merge context with new query if context exists
     merged_query = user_query
     should_merge_context = False
     
     if context:
         context_product_names = context.get("product_names", [])
-        reference_words = {"ones", "those", "them", "it", "these", "that", "this", "like", "new", "used", "good", "fair", "poor"}
         query_lower = user_query.lower()
-        has_reference = any(ref in query_lower for ref in reference_words)
+        has_reference = _REFERENCE_RE.search(query_lower) is not None
         
         # Check if query is just adding filters (condition, price) without product names
         # Examples: "like new", "under 50", "new condition", "less than 100"
-        filter_only_keywords = {"like", "new", "used", "good", "fair", "poor", "condition", 
-                                "under", "below", "less", "than", "over", "above", "more", 
-                                "between", "dollar", "dollars", "$", "price", "cost"}
-        query_words = set(query_lower.split())
-        is_filter_only = len(query_words - filter_only_keywords) == 0 or (len(query_words) <= 3 and query_words.issubset(filter_only_keywords | {"a", "an", "the", "in"}))
+        query_words = set(_QUERY_TOKEN_RE.findall(query_lower))
+        non_filter_count = 0  # words that are not filter keywords
+        content_count = 0  # ... and not filler either
+        has_long_noun = False
+        for word in query_words:
+            if word in _FILTER_ONLY_KEYWORDS:
+                continue
+            non_filter_count += 1
+            if word in _FILLER_WORDS:
+                continue
+            content_count += 1
+            if len(word) > 3:
+                has_long_noun = True
+        is_filter_only = non_filter_count == 0 or (len(query_words) <= 3 and content_count == 0)
         
         # Merge context if:
         # 1. Has explicit reference words, OR
         # 2. Query is filter-only (just adding condition/price to previous search), OR
         # 3. Query doesn't contain product names but context has product names
-        should_merge_context = has_reference or is_filter_only or (not any(len(w) > 3 for w in query_words if w not in filter_only_keywords) and context_product_names)
+        should_merge_context = has_reference or is_filter_only or (not has_long_noun and context_product_names)
         
         if should_merge_context and context_product_names:
             # User is referring to previous search, merge context
             merged_query = f"{' '.join(context_product_names)} {user_query}"
             logger.info(f"Merging context: '{merged_query}' (context product names: {context_product_names}, is_filter_only: {is_filter_only})")
     
-    # Get LLM client (OpenAI, Groq, Together, etc.)
-    client = get_openai_client()
-    if not client:
-        provider = getattr(settings, 'llm_provider', 'groq')
-        logger.warning(f"{provider.upper()} API key not configured. Returning basic fallback.")
-        # Minimal fallback - just return the query as product name
-        return {
-            "product_names": [user_query.strip()],
-            "category": None,
-            "condition": None,
-            "min_price": None,
-            "max_price": None,
-            "description": user_query
-        }
+    return merged_query, should_merge_context
+
+
+# Words that name a whole category; product words like "laptop" or "books" still go to the LLM for variations
+_DIRECT_CATEGORY_WORDS = {
+    word: _CATEGORY_MAPPINGS[word]
+    for word in (
+        "sports", "sport", "sports_fitness", "fitness", "athletic", "athletics", "exercise", "gym",
+        "electronics", "electronic", "tech", "technology",
+        "clothing", "clothes", "apparel",
+        "furniture", "furnishings", "furnishing",
+        "misc", "miscellaneous",
+    )
+}
+# Words a category-only or filter-only query may contain besides the category and price/condition phrases
+_DIRECT_FILLER_WORDS = _FILTER_ONLY_KEYWORDS | _FILLER_WORDS | frozenset({
+    "show", "me", "all", "any", "some", "equipment", "item", "items",
+})
+_DIRECT_TOKEN_RE = re.compile(r"[a-z_]+|\d")
+
+
+def _direct_criteria(
+    user_query: str,
+    context: Optional[Dict[str, any]],
+    merged_query: str,
+    should_merge_context: bool
+) -> Optional[Dict[str, any]]:
+    """
+    Resolve trivial queries without the LLM: bare categories ("electronics under 50")
+    and filter-only follow-ups to a previous search ("like new", "under 50").
+    Returns None when the query needs the LLM.
+    """
+    query_lower = user_query.lower()
+    min_price, max_price, condition = _scan_price_and_condition(query_lower)
+    remainder = _PRICE_CONDITION_RE.sub(" ", query_lower)
     
-    # Get available categories and conditions
-    categories = [cat.value for cat in ItemCategory]
-    conditions = [cond.value for cond in ItemCondition]
+    categories = set()
+    for token in _DIRECT_TOKEN_RE.findall(remainder):
+        category = _DIRECT_CATEGORY_WORDS.get(token)
+        if category is not None:
+            categories.add(category)
+        elif token not in _DIRECT_FILLER_WORDS:
+            return None
     
-    # Build context info for prompt
-    context_info = ""
-    if context:
-        context_parts = []
-        if context.get("product_names"):
-            context_parts.append(f"Previous search was for: {', '.join(context.get('product_names', []))}")
-        elif context.get("min_price") or context.get("max_price") or context.get("category") or context.get("condition"):
-            # If no product names but has filters, indicate this is a filter-only context
-            context_parts.append("Previous search had filters applied (no specific product)")
-        if context.get("category"):
-            context_parts.append(f"Category: {context.get('category')}")
-        if context.get("condition"):
-            context_parts.append(f"Condition: {context.get('condition')}")
-        if context.get("min_price") or context.get("max_price"):
-            price_range = []
-            if context.get("min_price"):
-                price_range.append(f"min: ${context.get('min_price')}")
-            if context.get("max_price"):
-                price_range.append(f"max: ${context.get('max_price')}")
-            context_parts.append(f"Price: {', '.join(price_range)}")
-        
-        if context_parts:
-            context_info = f"\n\nCONTEXT (previous search): {'; '.join(context_parts)}\nIf the user query refers to 'ones', 'those', 'them', 'it', etc., OR if the query is just adding filters (like 'like new', 'under 50'), apply the new filters to the previous search criteria. Keep the previous filters (price, category, condition) unless the new query explicitly changes them."
+    if len(categories) > 1:
+        return None
+    if not categories:
+        has_filters = min_price is not None or max_price is not None or condition is not None
+        if not (has_filters and context and should_merge_context):
+            return None
     
-    # Create intelligent prompt for OpenAI
-    system_prompt = f"""You are a search assistant for a campus marketplace. 
+    logger.info(f"Resolved query without LLM: '{user_query}'")
+    return _normalize_criteria(
+        {
+            "product_names": [],
+            "category": next(iter(categories), None),
+            "condition": condition,
+            "min_price": min_price,
+            "max_price": max_price,
+            "description": user_query
+        },
+        merged_query,
+        context,
+        should_merge_context
+    )
+
+
+def _unconfigured_fallback(user_query: str) -> Dict[str, any]:
+    """Minimal criteria when no LLM provider is configured - just the query as product name"""
+    provider = getattr(settings, 'llm_provider', 'groq')
+    logger.warning(f"{provider.upper()} API key not configured. Returning basic fallback.")
+    return {
+        "product_names": [user_query.strip()],
+        "category": None,
+        "condition": None,
+        "min_price": None,
+        "max_price": None,
+        "description": user_query
+    }
+
+
+def _extraction_provider_name() -> str:
+    """Human-readable provider name for extraction logs"""
+    provider = settings.openai_provider.lower() if hasattr(settings, 'openai_provider') else "openai"
+    return "Groq" if provider == "groq" else "OpenAI" if provider == "openai" else provider.upper()
+
+
+# Enum values the LLM may return; fixed for the process lifetime
+_CATEGORIES = tuple(sys.intern(cat.value) for cat in ItemCategory)
+_CONDITIONS = tuple(sys.intern(cond.value) for cond in ItemCondition)
+_CATEGORIES_SET = frozenset(_CATEGORIES)
+_CONDITIONS_SET = frozenset(_CONDITIONS)
+# Map parsed strings onto the interned enum values so later comparisons hit the identity fast path
+_CANONICAL_CATEGORIES = {value: value for value in _CATEGORIES}
+_CANONICAL_CONDITIONS = {value: value for value in _CONDITIONS}
+
+# Intelligent prompt for the LLM, built once at import
+_SYSTEM_PROMPT = f"""You are a search assistant for a campus marketplace. 
 Extract search criteria from user queries and return JSON with the following structure:
 
 IMPORTANT: Handle ALL question formats including "do you have X?", "have you got X?", "show me X", "I need X", "looking for X" - extract the product/object from these questions!
@@ -359,8 +418,8 @@ IMPORTANT: Handle ALL question formats including "do you have X?", "have you got
     "description": "cleaned description"
 }}
 
-Available categories (MUST use exact values): {", ".join(categories)}
-Available conditions (MUST use exact values): {", ".join(conditions)}
+Available categories (MUST use exact values): {", ".join(_CATEGORIES)}
+Available conditions (MUST use exact values): {", ".join(_CONDITIONS)}
 
 CRITICAL INSTRUCTIONS:
 
@@ -480,167 +539,493 @@ CRITICAL INSTRUCTIONS:
 
 Return only valid JSON, no additional text or markdown."""
 
+
+# JSON mode makes the provider return a bare object; the extraction schema stays well under 180 tokens
+_EXTRACTION_COMPLETION_PARAMS = {
+    "response_format": {"type": "json_object"},
+    "temperature": 0.2,  # Low temperature for consistent extraction
+    "top_p": 1,
+    "frequency_penalty": 0,
+    "max_tokens": 180,
+    "stream": False,
+}
+
+
+def _build_extraction_messages(merged_query: str, context: Optional[Dict[str, any]]) -> List[Dict[str, str]]:
+    """Chat messages asking the LLM to extract search criteria as JSON"""
+    # Build context info for prompt
+    context_info = ""
+    if context:
+        ctx_names = context.get("product_names") or []
+        ctx_cat = context.get("category")
+        ctx_cond = context.get("condition")
+        ctx_minp = context.get("min_price")
+        ctx_maxp = context.get("max_price")
+        
+        context_parts = []
+        if ctx_names:
+            context_parts.append(f"Previous search was for: {', '.join(ctx_names)}")
+        elif ctx_minp or ctx_maxp or ctx_cat or ctx_cond:
+            # If no product names but has filters, indicate this is a filter-only context
+            context_parts.append("Previous search had filters applied (no specific product)")
+        if ctx_cat:
+            context_parts.append(f"Category: {ctx_cat}")
+        if ctx_cond:
+            context_parts.append(f"Condition: {ctx_cond}")
+        if ctx_minp or ctx_maxp:
+            price_range = []
+            if ctx_minp:
+                price_range.append(f"min: ${ctx_minp}")
+            if ctx_maxp:
+                price_range.append(f"max: ${ctx_maxp}")
+            context_parts.append(f"Price: {', '.join(price_range)}")
+        
+        if context_parts:
+            context_info = "".join((
+                "\n\nCONTEXT (previous search): ",
+                "; ".join(context_parts),
+                "\nIf the user query refers to 'ones', 'those', 'them', 'it', etc., OR if the query is just adding filters (like 'like new', 'under 50'), apply the new filters to the previous search criteria. Keep the previous filters (price, category, condition) unless the new query explicitly changes them.",
+            ))
+    
     user_prompt = f"User query: {merged_query}{context_info}\n\nExtract search criteria:"
     
-    # Determine which provider is being used
-    provider = settings.openai_provider.lower() if hasattr(settings, 'openai_provider') else "openai"
-    provider_name = "Groq" if provider == "groq" else "OpenAI" if provider == "openai" else provider.upper()
+    return [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _normalize_criteria(
+    criteria: Dict[str, any],
+    merged_query: str,
+    context: Optional[Dict[str, any]],
+    should_merge_context: bool
+) -> Dict[str, any]:
+    """Validate raw extracted criteria and merge them with the previous search context"""
+    # Validate and normalize the response
+    product_names = criteria.get("product_names", [])
+    if not isinstance(product_names, list):
+        product_names = [product_names] if product_names else []
     
-    logger.info(f"🤖 Using {provider_name} AI for search criteria extraction")
+    # Ensure product names are strings, non-empty and unique (LLMs often repeat a variation)
+    product_names = list(dict.fromkeys(name for name in (str(pn).strip() for pn in product_names if pn) if name))
     
-    try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.2,  # Low temperature for consistent extraction
-            max_tokens=300
-        )
+    # Validate category
+    category = criteria.get("category")
+    if category and category not in _CATEGORIES_SET:
+        logger.warning(f"Invalid category '{category}' returned by AI. Setting to null.")
+        category = None
+    elif category:
+        category = _CANONICAL_CATEGORIES[category]
+    
+    # Validate condition
+    condition = criteria.get("condition")
+    if condition and condition not in _CONDITIONS_SET:
+        logger.warning(f"Invalid condition '{condition}' returned by AI. Setting to null.")
+        condition = None
+    elif condition:
+        condition = _CANONICAL_CONDITIONS[condition]
+    
+    # Validate prices
+    min_price = criteria.get("min_price")
+    max_price = criteria.get("max_price")
+    if min_price is not None:
+        try:
+            min_price = float(min_price)
+        except (ValueError, TypeError):
+            min_price = None
+    if max_price is not None:
+        try:
+            max_price = float(max_price)
+        except (ValueError, TypeError):
+            max_price = None
+    
+    # Swap prices if min > max
+    if min_price is not None and max_price is not None and min_price > max_price:
+        min_price, max_price = max_price, min_price
+    
+    # Merge with context if provided
+    if context and should_merge_context:
+        ctx_names = context.get("product_names")
+        ctx_cat = context.get("category")
+        ctx_cond = context.get("condition")
+        ctx_minp = context.get("min_price")
+        ctx_maxp = context.get("max_price")
+        
+        # If new query has product names, use them; otherwise keep context
+        if not product_names and ctx_names:
+            product_names = ctx_names
+            logger.info(f"Merged product_names from context: {product_names}")
         
-        content = response.choices[0].message.content.strip()
+        # If new query has category, use it; otherwise keep context
+        if not category and ctx_cat:
+            category = ctx_cat
+            logger.info(f"Merged category from context: {category}")
         
-        logger.info(f"✅ {provider_name} AI response received")
-        logger.info(f"=== {provider_name.upper()} RAW RESPONSE ===")
-        logger.info(f"Raw response: {content}")
+        # Merge condition: new query overrides, but if new query doesn't have condition, keep context
+        if condition:
+            logger.info(f"Using condition from new query: {condition}")
+        elif ctx_cond:
+            condition = ctx_cond
+            logger.info(f"Merged condition from context: {condition}")
         
-        # Parse JSON response
+        # Merge prices: new query overrides, but if new query doesn't have prices, keep context
+        if min_price is not None:
+            logger.info(f"Using min_price from new query: {min_price}")
+        elif ctx_minp is not None:
+            min_price = ctx_minp
+            logger.info(f"Merged min_price from context: {min_price}")
+        
+        if max_price is not None:
+            logger.info(f"Using max_price from new query: {max_price}")
+        elif ctx_maxp is not None:
+            max_price = ctx_maxp
+            logger.info(f"Merged max_price from context: {max_price}")
+    
+    result = {
+        "product_names": product_names,
+        "category": category,
+        "condition": condition,
+        "min_price": min_price,
+        "max_price": max_price,
+        "description": criteria.get("description", merged_query)
+    }
+    
+    logger.info(f"Extracted search criteria: {result}")
+    return result
+
+
+# Leading ```json / ``` and trailing ``` around a model reply
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+
+def _parse_extraction_response(
+    content: str,
+    merged_query: str,
+    context: Optional[Dict[str, any]],
+    should_merge_context: bool,
+    provider_name: str
+) -> Dict[str, any]:
+    """Validate the LLM's JSON reply and merge it with the previous search context"""
+    logger.info(f"✅ {provider_name} AI response received")
+    logger.info(f"=== {provider_name.upper()} RAW RESPONSE ===")
+    logger.info(f"Raw response: {content}")
+    
+    # Parse JSON response
+    try:
         try:
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
+            # JSON mode returns a bare object (orjson tolerates surrounding whitespace)
+            criteria = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Providers that ignore JSON mode may wrap the object in markdown fences
+            content = _FENCE_RE.sub("", content).strip()
             logger.info(f"Cleaned response: {content}")
-            criteria = json.loads(content)
-            logger.info(f"Parsed JSON: {criteria}")
-            
-            # Validate and normalize the response
-            product_names = criteria.get("product_names", [])
-            if not isinstance(product_names, list):
-                product_names = [product_names] if product_names else []
-            
-            # Ensure product names are strings and non-empty
-            product_names = [str(pn).strip() for pn in product_names if pn and str(pn).strip()]
-            
-            # Validate category
-            category = criteria.get("category")
-            if category and category not in categories:
-                logger.warning(f"Invalid category '{category}' returned by AI. Setting to null.")
-                category = None
-            
-            # Validate condition
-            condition = criteria.get("condition")
-            if condition and condition not in conditions:
-                logger.warning(f"Invalid condition '{condition}' returned by AI. Setting to null.")
-                condition = None
-            
-            # Validate prices
-            min_price = criteria.get("min_price")
-            max_price = criteria.get("max_price")
-            if min_price is not None:
-                try:
-                    min_price = float(min_price)
-                except (ValueError, TypeError):
-                    min_price = None
-            if max_price is not None:
-                try:
-                    max_price = float(max_price)
-                except (ValueError, TypeError):
-                    max_price = None
-            
-            # Swap prices if min > max
-            if min_price is not None and max_price is not None and min_price > max_price:
-                min_price, max_price = max_price, min_price
-            
-            # Merge with context if provided
-            if context and should_merge_context:
-                # If new query has product names, use them; otherwise keep context
-                if not product_names and context.get("product_names"):
-                    product_names = context.get("product_names", [])
-                    logger.info(f"Merged product_names from context: {product_names}")
-                
-                # If new query has category, use it; otherwise keep context
-                if not category and context.get("category"):
-                    category = context.get("category")
-                    logger.info(f"Merged category from context: {category}")
-                
-                # Merge condition: new query overrides, but if new query doesn't have condition, keep context
-                if condition:
-                    logger.info(f"Using condition from new query: {condition}")
-                elif context.get("condition"):
-                    condition = context.get("condition")
-                    logger.info(f"Merged condition from context: {condition}")
-                
-                # Merge prices: new query overrides, but if new query doesn't have prices, keep context
-                if min_price is not None:
-                    logger.info(f"Using min_price from new query: {min_price}")
-                elif context.get("min_price") is not None:
-                    min_price = context.get("min_price")
-                    logger.info(f"Merged min_price from context: {min_price}")
-                
-                if max_price is not None:
-                    logger.info(f"Using max_price from new query: {max_price}")
-                elif context.get("max_price") is not None:
-                    max_price = context.get("max_price")
-                    logger.info(f"Merged max_price from context: {max_price}")
-            
-            result = {
-                "product_names": product_names,
-                "category": category,
-                "condition": condition,
-                "min_price": min_price,
-                "max_price": max_price,
-                "description": criteria.get("description", merged_query)
-            }
-            
-            logger.info(f"Extracted search criteria: {result}")
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
-            logger.error(f"Response content: {content}")
-            # Fallback: try basic spelling correction
-            corrected_names = _simple_spelling_correction(merged_query.strip())
-            logger.warning(f"LLM JSON parse failed, using fallback spelling correction: {corrected_names}")
-            return {
-                "product_names": corrected_names,
-                "category": None,
-                "condition": None,
-                "min_price": None,
-                "max_price": None,
-                "description": merged_query
-            }
-            
-    except RateLimitError as e:
-        logger.error(f"❌ Rate limit error from {provider_name} API: {e}")
-        logger.warning(f"⚠️  Switching to FALLBACK mechanism (regex-based extraction)")
-        # Fallback: extract product names and prices using simple parsing
-        fallback_result = _extract_fallback_criteria(merged_query.strip())
-        fallback_result["extraction_method"] = "Fallback (Rate Limited)"
-        logger.warning(f"🔧 Fallback extraction result: {fallback_result}")
-        return fallback_result
-    except APIError as e:
-        logger.error(f"❌ API error from {provider_name}: {e}")
-        logger.warning(f"⚠️  Switching to FALLBACK mechanism (regex-based extraction)")
-        # Fallback: extract product names and prices using simple parsing
-        fallback_result = _extract_fallback_criteria(merged_query.strip())
-        fallback_result["extraction_method"] = "Fallback (API Error)"
-        logger.warning(f"🔧 Fallback extraction result: {fallback_result}")
-        return fallback_result
+            criteria = orjson.loads(content)
+        logger.info(f"Parsed JSON: {criteria}")
+        
+        return _normalize_criteria(criteria, merged_query, context, should_merge_context)
+        
+    except orjson.JSONDecodeError as e:
+        logger.error(f"Failed to parse LLM response as JSON: {e}")
+        logger.error(f"Response content: {content}")
+        return _regex_fallback(merged_query, context, should_merge_context, "Fallback (Invalid JSON)")
+
+
+def _fallback_after_llm_error(
+    exc: Exception,
+    merged_query: str,
+    context: Optional[Dict[str, any]],
+    should_merge_context: bool,
+    provider_name: str
+) -> Dict[str, any]:
+    """Regex-based extraction when the LLM call fails"""
+    if isinstance(exc, RateLimitError):
+        logger.error(f"❌ Rate limit error from {provider_name} API: {exc}")
+        method = "Fallback (Rate Limited)"
+    elif isinstance(exc, APIError):
+        logger.error(f"❌ API error from {provider_name}: {exc}")
+        method = "Fallback (API Error)"
+    else:
+        logger.error(f"❌ Error calling {provider_name} API: {exc}")
+        method = "Fallback (Error)"
+    logger.warning(f"⚠️  Switching to FALLBACK mechanism (regex-based extraction)")
+    return _regex_fallback(merged_query, context, should_merge_context, method)
+
+
+def _regex_fallback(
+    merged_query: str,
+    context: Optional[Dict[str, any]],
+    should_merge_context: bool,
+    method: str
+) -> Dict[str, any]:
+    """Regex-based extraction, validated and merged with the previous search exactly like an LLM reply"""
+    # Fallback: extract product names and prices using simple parsing
+    fallback_result = _normalize_criteria(
+        _extract_fallback_criteria(merged_query.strip()), merged_query, context, should_merge_context
+    )
+    fallback_result["extraction_method"] = method
+    logger.warning(f"🔧 Fallback extraction result: {fallback_result}")
+    return fallback_result
+
+
+def extract_search_criteria(user_query: str, context: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+    """
+    Extract search criteria from natural language query using OpenAI.
+    ChatGPT will intelligently:
+    - Correct spelling errors automatically (e.g., "callcullator" → "calculator")
+    - Identify product names and suggest variations (e.g., ["calculator", "calc", "graphing calculator"])
+    - Detect category from static list
+    - Extract condition if mentioned
+    - Extract price range if mentioned
+    
+    Args:
+        user_query: Natural language description of what user wants
+        context: Optional previous search criteria to merge with new query
+        
+    Returns:
+        Dictionary with extracted search criteria:
+        {
+            "product_names": ["corrected_name", "variation1", "variation2"],  # Product name variations for DB search
+            "category": "electronics" | None,  # From static category list
+            "condition": "like_new" | None,  # If mentioned in query
+            "min_price": float | None,  # If mentioned in query
+            "max_price": float | None,  # If mentioned in query
+            "description": "cleaned description"
+        }
+    """
+    merged_query, should_merge_context = _merge_query_with_context(user_query, context)
+    
+    # Bare categories and filter-only follow-ups need no LLM round-trip
+    direct = _direct_criteria(user_query, context, merged_query, should_merge_context)
+    if direct is not None:
+        return direct
+    
+    return _extract_with_llm(user_query, context, merged_query, should_merge_context)
+
+
+async def extract_search_criteria_async(user_query: str, context: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+    """
+    Same as extract_search_criteria, but awaits the LLM call on the async client
+    so an event loop can overlap many extractions instead of parking a thread on each.
+    Independent queries can be run concurrently with asyncio.gather.
+    """
+    merged_query, should_merge_context = _merge_query_with_context(user_query, context)
+    
+    # Bare categories and filter-only follow-ups need no LLM round-trip
+    direct = _direct_criteria(user_query, context, merged_query, should_merge_context)
+    if direct is not None:
+        return direct
+    
+    return await _extract_with_llm_async(user_query, context, merged_query, should_merge_context)
+
+
+def _extract_with_llm(
+    user_query: str,
+    context: Optional[Dict[str, any]],
+    merged_query: str,
+    should_merge_context: bool
+) -> Dict[str, any]:
+    # Get LLM client (OpenAI, Groq, Together, etc.)
+    client = get_openai_client()
+    if not client:
+        return _unconfigured_fallback(user_query)
+    
+    messages = _build_extraction_messages(merged_query, context)
+    provider_name = _extraction_provider_name()
+    logger.info(f"🤖 Using {provider_name} AI for search criteria extraction")
+    
+    try:
+        response = client.chat.completions.create(
+            model=settings.openai_model,
+            messages=messages,
+            **_EXTRACTION_COMPLETION_PARAMS
+        )
+        return _parse_extraction_response(
+            response.choices[0].message.content, merged_query, context, should_merge_context, provider_name
+        )
+    except Exception as e:
+        return _fallback_after_llm_error(e, merged_query, context, should_merge_context, provider_name)
+
+
+async def _extract_with_llm_async(
+    user_query: str,
+    context: Optional[Dict[str, any]],
+    merged_query: str,
+    should_merge_context: bool
+) -> Dict[str, any]:
+    client = get_async_openai_client()
+    if not client:
+        return _unconfigured_fallback(user_query)
+    
+    messages = _build_extraction_messages(merged_query, context)
+    provider_name = _extraction_provider_name()
+    logger.info(f"🤖 Using {provider_name} AI for search criteria extraction")
+    
+    try:
+        response = await client.chat.completions.create(
+            model=settings.openai_model,
+            messages=messages,
+            **_EXTRACTION_COMPLETION_PARAMS
+        )
+        return _parse_extraction_response(
+            response.choices[0].message.content, merged_query, context, should_merge_context, provider_name
+        )
     except Exception as e:
-        logger.error(f"❌ Error calling {provider_name} API: {e}")
-        logger.warning(f"⚠️  Switching to FALLBACK mechanism (regex-based extraction)")
-        # Fallback: extract product names and prices using simple parsing
-        fallback_result = _extract_fallback_criteria(merged_query.strip())
-        fallback_result["extraction_method"] = "Fallback (Error)"
-        logger.warning(f"🔧 Fallback extraction result: {fallback_result}")
-        return fallback_result
+        return _fallback_after_llm_error(e, merged_query, context, should_merge_context, provider_name)
+
+
+def _freeze_context(context: Optional[Dict[str, any]]) -> Optional[tuple]:
+    """Convert a search context dict into a hashable, order-independent tuple"""
+    if not context:
+        return None
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in context.items()
+    ))
+
+
+def _embed_for_extraction_cache(normalized_query: str) -> Optional[np.ndarray]:
+    """Query embedding for the semantic criteria tier, or None when that tier is off or embedding fails"""
+    if not settings.ai_search_semantic_cache or not settings.openai_api_key:
+        return None
+    try:
+        return l2_normalize(embed_query(normalized_query))
+    except Exception as e:
+        logger.warning(f"Criteria cache embedding failed: {e}")
+        return None
+
+
+def _extraction_cache_key(user_query: str, context: Optional[Dict[str, any]]) -> tuple:
+    """(lowercased query with whitespace runs collapsed, frozen context)"""
+    return " ".join(user_query.lower().split()), _freeze_context(context)
+
+
+def _copy_criteria(criteria: Dict[str, any]) -> Dict[str, any]:
+    """
+    Copy a criteria dict for the caches. Every value is an immutable scalar except
+    product_names, so copying that one list is as safe as a deepcopy and much cheaper.
+    """
+    copied = dict(criteria)
+    if isinstance(copied.get("product_names"), list):
+        copied["product_names"] = list(copied["product_names"])
+    return copied
+
+
+def _get_exact_extraction(cache_key: tuple) -> Optional[Dict[str, any]]:
+    with _extraction_cache_lock:
+        cached = _extraction_cache.get(cache_key)
+        if cached is None:
+            return None
+        _extraction_cache.move_to_end(cache_key)
+        return _copy_criteria(cached)
+
+
+def _extraction_semantic_scope(cache_key: tuple) -> str:
+    """
+    Paraphrases only share criteria under the same context and the same price/condition words:
+    "iphone under 50" and "iphone under 500" embed almost identically but need different filters
+    """
+    normalized_query, frozen_context = cache_key
+    return repr((_scan_price_and_condition(normalized_query), frozen_context))
+
+
+def _get_semantic_extraction(cache_key: tuple) -> tuple:
+    """
+    Look up criteria for a paraphrase of the query (blocking: embeds the query).
+
+    Returns:
+        (vector, cached) where vector is None when the semantic tier is off
+    """
+    normalized_query = cache_key[0]
+    vector = _embed_for_extraction_cache(normalized_query)
+    if vector is None:
+        return None, None
+    cached = _extraction_semantic_cache.lookup(vector, _extraction_semantic_scope(cache_key))
+    if cached is not None:
+        logger.debug("Criteria cache semantic hit for %r", normalized_query)
+        _store_extraction(cache_key, cached)
+        return vector, _copy_criteria(cached)
+    return vector, None
+
+
+def _remember_extraction(cache_key: tuple, vector: Optional[np.ndarray], criteria: Dict[str, any]) -> None:
+    # Fallback results (rate limits, API errors) are not cached so the LLM is retried next time
+    if "extraction_method" in criteria:
+        return
+    _store_extraction(cache_key, criteria)
+    if vector is not None:
+        _extraction_semantic_cache.store(vector, _extraction_semantic_scope(cache_key), _copy_criteria(criteria))
+
+
+def extract_search_criteria_cached(user_query: str, context: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+    """
+    Same as extract_search_criteria, but repeated queries within this worker skip the LLM call.
+    Exact repeats (ignoring case and whitespace) hit an LRU; with the semantic cache enabled,
+    close paraphrases under the same context and price/condition words reuse criteria by embedding similarity.
+    Fallback results (rate limits, API errors) are not cached so the LLM is retried next time.
+    """
+    cache_key = _extraction_cache_key(user_query, context)
+    cached = _get_exact_extraction(cache_key)
+    if cached is not None:
+        return cached
+
+    # Trivial queries are cheaper to resolve than to embed for the semantic tier
+    merged_query, should_merge_context = _merge_query_with_context(user_query, context)
+    direct = _direct_criteria(user_query, context, merged_query, should_merge_context)
+    if direct is not None:
+        return direct
+
+    vector, cached = _get_semantic_extraction(cache_key)
+    if cached is not None:
+        return cached
+
+    criteria = _extract_with_llm(user_query, context, merged_query, should_merge_context)
+    _remember_extraction(cache_key, vector, criteria)
+    return criteria
+
+
+async def extract_search_criteria_cached_async(user_query: str, context: Optional[Dict[str, any]] = None) -> Dict[str, any]:
+    """Async counterpart of extract_search_criteria_cached; the embedding lookup runs in a worker thread"""
+    cache_key = _extraction_cache_key(user_query, context)
+    cached = _get_exact_extraction(cache_key)
+    if cached is not None:
+        return cached
+
+    merged_query, should_merge_context = _merge_query_with_context(user_query, context)
+    direct = _direct_criteria(user_query, context, merged_query, should_merge_context)
+    if direct is not None:
+        return direct
+
+    vector = None
+    if settings.ai_search_semantic_cache:
+        vector, cached = await asyncio.to_thread(_get_semantic_extraction, cache_key)
+        if cached is not None:
+            return cached
+
+    criteria = await _extract_with_llm_async(user_query, context, merged_query, should_merge_context)
+    _remember_extraction(cache_key, vector, criteria)
+    return criteria
+
+
+def _store_extraction(cache_key: tuple, criteria: Dict[str, any]) -> None:
+    with _extraction_cache_lock:
+        _extraction_cache[cache_key] = _copy_criteria(criteria)
+        _extraction_cache.move_to_end(cache_key)
+        if len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+
+
+# Price phrases for the regex fallback in one alternation, so the query is scanned once
+_FALLBACK_PRICE_RE = re.compile("|".join([
+    # "between X and Y"
+    r'between\s+\$?(?P<between_min>\d+(?:\.\d+)?)\s+and\s+\$?(?P<between_max>\d+(?:\.\d+)?)',
+    # "under", "below", "less than", "cheaper than" (also "under 50 dollars")
+    r'(?:under|below|less\s+than|cheaper\s+than)\s+\$?(?P<under>\d+(?:\.\d+)?)',
+    # "over", "above", "more than", "at least" (also "over 100 dollars")
+    r'(?:over|above|more\s+than|at\s+least)\s+\$?(?P<over>\d+(?:\.\d+)?)',
+]))
+# Price-related words removed before spelling correction
+_PRICE_WORDS_RE = re.compile(r'\b(?:under|below|over|above|less|more|than|at least|between|and|\$|\d+)\b')
 
 
 def _extract_fallback_criteria(query: str) -> Dict[str, any]:
@@ -659,47 +1044,24 @@ def _extract_fallback_criteria(query: str) -> Dict[str, any]:
     min_price = None
     max_price = None
     
-    # Patterns for "under", "below", "less than", "cheaper than"
-    under_patterns = [
-        r'under\s+\$?(\d+(?:\.\d+)?)',
-        r'below\s+\$?(\d+(?:\.\d+)?)',
-        r'less\s+than\s+\$?(\d+(?:\.\d+)?)',
-        r'cheaper\s+than\s+\$?(\d+(?:\.\d+)?)',
-        r'under\s+(\d+(?:\.\d+)?)\s*dollars?',
-    ]
-    
-    # Patterns for "over", "above", "more than", "at least"
-    over_patterns = [
-        r'over\s+\$?(\d+(?:\.\d+)?)',
-        r'above\s+\$?(\d+(?:\.\d+)?)',
-        r'more\s+than\s+\$?(\d+(?:\.\d+)?)',
-        r'at\s+least\s+\$?(\d+(?:\.\d+)?)',
-        r'over\s+(\d+(?:\.\d+)?)\s*dollars?',
-    ]
-    
-    # Patterns for "between X and Y"
-    between_pattern = r'between\s+\$?(\d+(?:\.\d+)?)\s+and\s+\$?(\d+(?:\.\d+)?)'
-    
-    # Check for "under" patterns
-    for pattern in under_patterns:
-        match = re.search(pattern, query_lower)
-        if match:
-            max_price = float(match.group(1))
-            break
+    under_price = over_price = between = None
+    for match in _FALLBACK_PRICE_RE.finditer(query_lower):
+        if match.group("between_min") is not None:
+            if between is None:
+                between = (float(match.group("between_min")), float(match.group("between_max")))
+        elif match.group("under") is not None:
+            if under_price is None:
+                under_price = float(match.group("under"))
+        elif over_price is None:
+            over_price = float(match.group("over"))
     
-    # Check for "over" patterns
-    if max_price is None:  # Only check if we didn't find "under"
-        for pattern in over_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                min_price = float(match.group(1))
-                break
-    
-    # Check for "between" pattern
-    between_match = re.search(between_pattern, query_lower)
-    if between_match:
-        min_price = float(between_match.group(1))
-        max_price = float(between_match.group(2))
+    # "under" wins over "over"; "between" overrides both
+    if between is not None:
+        min_price, max_price = between
+    elif under_price is not None:
+        max_price = under_price
+    else:
+        min_price = over_price
     
     result = {
         "product_names": product_names,
@@ -714,581 +1076,165 @@ def _extract_fallback_criteria(query: str) -> Dict[str, any]:
     return result
 
 
+# Common product names that might be in the database
+_COMMON_PRODUCTS = (
+    "calculator", "calc", "graphing calculator", "scientific calculator",
+    "laptop", "laptops", "notebook", "computer",
+    "phone", "iphone", "smartphone",
+    "textbook", "book", "books",
+    "racket", "tennis racket", "tennis rackets", "rackets",
+    "gloves", "glove",
+    "shoes", "shoe",
+    "bike", "bicycle",
+    "chair", "desk", "table",
+    "cricket", "cricket bat", "cricket ball", "cricket equipment",
+)
+
+# Related search terms for product families, keyed by the word that identifies the family
+_PRODUCT_FAMILY_VARIATIONS = (
+    ("calculator", ("calculator", "calc", "graphing calculator")),
+    ("laptop", ("laptop", "laptops", "notebook")),
+    ("racket", ("racket", "tennis racket", "rackets", "tennis rackets")),
+    ("cricket", ("cricket", "cricket bat", "cricket ball")),
+)
+
+
+def _product_variations(product: str) -> tuple:
+    for family, variations in _PRODUCT_FAMILY_VARIATIONS:
+        if family in product:
+            return tuple(dict.fromkeys((product, *variations)))
+    return (product,)
+
+
+# Corrected name plus related variations for every common product
+_COMMON_PRODUCT_VARIATIONS = {product: _product_variations(product) for product in _COMMON_PRODUCTS}
+
+
+SPELLING_SCORE_CUTOFF = 75
+
+
 def _simple_spelling_correction(query: str) -> List[str]:
     """
     Simple spelling correction fallback when LLM is unavailable.
     Uses common product names and fuzzy matching.
     """
     # Remove price-related words for product name extraction
-    query_clean = re.sub(r'\b(under|below|over|above|less|more|than|at least|between|and|\$|\d+)\b', '', query, flags=re.IGNORECASE)
-    query_clean = query_clean.strip()
-    
-    # Common product names that might be in the database
-    common_products = [
-        "calculator", "calc", "graphing calculator", "scientific calculator",
-        "laptop", "laptops", "notebook", "computer",
-        "phone", "iphone", "smartphone",
-        "textbook", "book", "books",
-        "racket", "tennis racket", "tennis rackets", "rackets",
-        "gloves", "glove",
-        "shoes", "shoe",
-        "bike", "bicycle",
-        "chair", "desk", "table",
-        "cricket", "cricket bat", "cricket ball", "cricket equipment"
-    ]
+    query_lower = _PRICE_WORDS_RE.sub('', query.lower()).strip()
     
-    query_lower = query_clean.lower().strip()
+    # Correctly spelled products (the common case) need no fuzzy matching
+    if query_lower in _COMMON_PRODUCT_VARIATIONS:
+        return list(_COMMON_PRODUCT_VARIATIONS[query_lower])
+    for token in query_lower.split():
+        if token in _COMMON_PRODUCT_VARIATIONS:
+            return list(_COMMON_PRODUCT_VARIATIONS[token])
     
-    # Try to find close matches (fuzzy matching)
-    close_matches = get_close_matches(query_lower, common_products, n=3, cutoff=0.6)
+    # Try to find a close match for a misspelled product (fuzzy matching). Plain ratio compares the whole
+    # query, so a long query never partially matches a short product ("headphones" is not a "phone");
+    # products named inside a longer query were already found by the token lookup above
+    close_match = process.extractOne(query_lower, _COMMON_PRODUCTS, scorer=fuzz.ratio, score_cutoff=SPELLING_SCORE_CUTOFF)
     
-    if close_matches:
+    if close_match:
         # Found a match - return the corrected name and variations
-        corrected = close_matches[0]
-        variations = [corrected]
-        
-        # Add related variations
-        if "calculator" in corrected:
-            variations.extend(["calculator", "calc", "graphing calculator"])
-        elif "laptop" in corrected:
-            variations.extend(["laptop", "laptops", "notebook"])
-        elif "racket" in corrected:
-            variations.extend(["racket", "tennis racket", "rackets", "tennis rackets"])
-        elif "cricket" in corrected:
-            variations.extend(["cricket", "cricket bat", "cricket ball"])
-        
-        return list(set(variations))  # Remove duplicates
+        return list(_COMMON_PRODUCT_VARIATIONS[close_match[0]])
     
     # No close match found - return original query (cleaned)
-    return [query_clean] if query_clean else [query]
+    return [query_lower] if query_lower else [query]
 
 
-def find_similar_items_by_semantics(
-    user_query: str,
-    items: List[Dict],
-    top_k: int = 10
-) -> List[Dict]:
-    """
-    Use OpenAI embeddings to find semantically similar items
-    
-    This approach compares the semantic meaning of the query with item descriptions
-    """
-    if not settings.openai_api_key:
-        logger.warning("OpenAI API key not configured for semantic search")
-        return []
-    
-    client = get_openai_client()
-    if not client:
-        return []
-        category = map_category_name_to_enum(user_query)
-        
-        # If that doesn't work, check for category keywords
-        if not category:
-            if any(term in query_lower for term in ["sports", "fitness", "athletic", "exercise", "gym"]):
-                category = "sports_fitness"
-            elif any(term in query_lower for term in ["electronics", "tech", "phone", "laptop", "computer", "device"]):
-                category = "electronics"
-            elif any(term in query_lower for term in ["textbook", "book", "text book"]):
-                category = "textbooks"
-            elif any(term in query_lower for term in ["clothing", "clothes", "apparel", "wear"]):
-                category = "clothing"
-            elif any(term in query_lower for term in ["furniture", "furnishing"]):
-                category = "furniture"
-            elif any(term in query_lower for term in ["other", "misc", "miscellaneous"]):
-                category = "other"
-        
-        # Map to enum value if found
-        if category:
-            category = map_category_name_to_enum(category) or category
-        
-        # If multiple keywords, prefer product names over descriptive words
-        if len(keywords) > 1:
-            product_keywords = {"gloves", "laptop", "phone", "iphone", "textbook", "book", 
-                               "racket", "rackets", "tennis", "shoes", "bag", "backpack", "chair", 
-                               "table", "desk", "bike", "bicycle", "car", "calculator"}
-            product_matches = [kw for kw in keywords if kw in product_keywords]
-            if product_matches:
-                # Prioritize longer/more specific product names (e.g., "rackets" over "tennis")
-                # Sort by length descending, then use the longest
-                product_matches.sort(key=len, reverse=True)
-                keywords = [product_matches[0]]  # Use most specific product name
-                logger.info(f"Fallback: Multiple keywords, using product keyword: {keywords}")
-            else:
-                # If no known product, use longest keyword
-                keywords = [max(keywords, key=len)]
-                logger.info(f"Fallback: Multiple keywords, using longest: {keywords}")
-        
-        logger.info(f"Fallback: Extracted keywords: {keywords}, category: {category}, price range - min: {min_price}, max: {max_price}, condition: {condition}")
-        
-        # Determine if this is a category-only query
-        # If category is detected and query seems to be about the category (not a specific product), treat as category query
-        query_lower = merged_query.lower().strip()
-        is_category_query = False
-        if category:
-            # First check if the query is exactly the category name
-            mapped_category = map_category_name_to_enum(query_lower)
-            if mapped_category == category:
-                is_category_query = True
-                logger.info(f"Fallback: Query '{query_lower}' is exactly category name '{category}', treating as category query")
-            elif (
-                any(term in query_lower for term in ["equipment", "items", "products", "stuff", "things", "show all", "all"]) or
-                (len(query_lower.split()) <= 3 and any(cat_term in query_lower for cat_term in ["sports", "fitness", "electronics", "textbook", "clothing", "furniture"]))
-            ):
-                is_category_query = True
-        
-        # Merge with context if provided
-        # For category queries, clear keywords
-        if is_category_query:
-            final_keywords = []
-            logger.info(f"Fallback: Category-only query detected, clearing keywords")
-        else:
-            final_keywords = keywords if keywords else (context.get("keywords", []) if context else user_query.split())
-        
-        final_category = category if category else (context.get("category") if context else None)
-        final_condition = condition if condition else (context.get("condition") if context else None)
-        final_min_price = min_price if min_price else (context.get("min_price") if context else None)
-        final_max_price = max_price if max_price else (context.get("max_price") if context else None)
-        
-        # Check if this is an "all [filter]" query - if so, clear keywords
-        has_price_filter = final_min_price or final_max_price
-        has_condition_filter = final_condition is not None
-        
-        is_all_query_explicit = (
-            "show all" in query_lower or 
-            query_lower.startswith("all ") or 
-            "all " in query_lower or
-            "all products" in query_lower or
-            "all items" in query_lower
-        )
-        
-        if (is_all_query_explicit and (final_category or has_price_filter or has_condition_filter)) or is_category_query:
-            # "All" query with filters or category-only query - return empty keywords to get all items matching the filters
-            final_keywords = []
-            logger.info(f"'All' query or category query detected in fallback (category: {final_category}, price: {has_price_filter}, condition: {has_condition_filter}), clearing keywords")
-        
-        return {
-            "keywords": final_keywords,  # Already handled category queries above
-            "category": final_category,
-            "condition": final_condition,
-            "min_price": final_min_price,
-            "max_price": final_max_price,
-            "description": merged_query
-        }
-    
+EMBEDDING_MODEL = "text-embedding-3-small"
+# text-embedding-3 models can return shortened vectors; 512 dims keep nearly all of the ranking quality
+# at a third of the size, which matters for the per-worker caches holding thousands of them
+EMBEDDING_DIMENSIONS = 512
+
+# Item embeddings keyed by SHA-256 of model + title + description, so edits invalidate
+# and items with identical text share one entry. Stored as float16: half the memory, and
+# rank order of unit-length 512-d vectors is unaffected at that precision
+ITEM_EMBEDDING_CACHE_SIZE = 4096
+_item_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_item_embedding_cache_lock = threading.Lock()
+
+# Large miss sets are split into batches embedded in parallel, so K batches cost about one round-trip
+# (the client already retries 429s with backoff)
+ITEM_EMBEDDING_BATCH_SIZE = 256
+ITEM_EMBEDDING_MAX_CONCURRENCY = 4
+_item_embedding_executor = ThreadPoolExecutor(max_workers=ITEM_EMBEDDING_MAX_CONCURRENCY, thread_name_prefix="item-embeddings")
+
+
+def _unit_vector(embedding) -> np.ndarray:
+    """L2-normalize once when caching, so similarity at query time is a plain dot product"""
+    vector = np.array(embedding, dtype=np.float32)
+    vector /= np.linalg.norm(vector) or 1.0
+    return vector
+
+
+@functools.lru_cache(maxsize=2048)
+def _embed_query_normalized(normalized_query: str) -> np.ndarray:
     client = get_openai_client()
-    if not client:
-        # Merge with context if provided
-        final_keywords = user_query.split() if not context or not context.get("keywords") else context.get("keywords", [])
-        return {
-            "keywords": final_keywords,
-            "category": context.get("category") if context else None,
-            "condition": context.get("condition") if context else None,
-            "min_price": context.get("min_price") if context else None,
-            "max_price": context.get("max_price") if context else None,
-            "description": merged_query
-        }
-    
-    # Get available categories
-    categories = [cat.value for cat in ItemCategory]
-    conditions = [cond.value for cond in ItemCondition]
-    
-    # Create prompt for OpenAI
-    system_prompt = """You are a search assistant for a campus marketplace. 
-Extract search criteria from user queries and return JSON with the following structure:
-{
-    "keywords": ["list", "of", "important", "keywords"] or [],
-    "category": "category_name" or null,
-    "condition": "condition_name" or null,
-    "min_price": number or null,
-    "max_price": number or null,
-    "description": "cleaned description",
-    "query_type": "product" or "category" or "both"
-}
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=normalized_query, dimensions=EMBEDDING_DIMENSIONS)
+    vector = _unit_vector(response.data[0].embedding)
+    vector.setflags(write=False)  # Shared between callers via the cache
+    return vector
 
-Available categories: """ + ", ".join(categories) + """
-Available conditions: """ + ", ".join(conditions) + """
-
-CRITICAL INSTRUCTIONS - DISTINGUISHING PRODUCTS vs CATEGORIES:
-
-**PRODUCT QUERIES** (query_type: "product"):
-- User is looking for a SPECIFIC product/item: "tennis rackets", "laptop", "iPhone", "gloves", "textbook"
-- Extract the product name as keywords: ["racket"], ["laptop"], ["iPhone"], ["gloves"], ["textbook"]
-- Set category to null (unless explicitly mentioned)
-- Examples:
-  * "tennis rackets" → keywords: ["racket"], category: null, query_type: "product"
-  * "laptop under 500" → keywords: ["laptop"], category: null, max_price: 500, query_type: "product"
-  * "woollen gloves" → keywords: ["gloves"], category: null, query_type: "product"
-  * "iPhone 15" → keywords: ["iPhone", "15"], category: null, query_type: "product"
-
-**CATEGORY QUERIES** (query_type: "category"):
-- User is looking for ALL items in a CATEGORY: "sports equipment", "electronics", "textbooks", "clothing"
-- Set keywords to EMPTY ARRAY [] to return all items in that category
-- Extract the category name
-- Examples:
-  * "sports equipment" → keywords: [], category: "sports_fitness", query_type: "category"
-  * "electronics" → keywords: [], category: "electronics", query_type: "category"
-  * "textbooks" → keywords: [], category: "textbooks", query_type: "category"
-  * "show all sports equipment" → keywords: [], category: "sports_fitness", query_type: "category"
-  * "all electronics" → keywords: [], category: "electronics", query_type: "category"
-
-**COMBINED QUERIES** (query_type: "both"):
-- User mentions both a category AND a specific product: "tennis rackets in sports equipment"
-- Extract both keywords AND category
-- Examples:
-  * "laptop in electronics" → keywords: ["laptop"], category: "electronics", query_type: "both"
-
-CATEGORY MAPPING:
-- "sports", "sports equipment", "fitness", "athletic", "exercise", "gym" → category: "sports_fitness"
-- "electronics", "tech", "technology", "devices" → category: "electronics"
-- "textbook", "book", "textbooks", "books" → category: "textbooks"
-- "clothing", "clothes", "apparel", "wear" → category: "clothing"
-- "furniture", "furnishings" → category: "furniture"
-- "other", "misc", "miscellaneous" → category: "other"
-
-KEYWORD EXTRACTION RULES (for product queries only):
-1. Extract ONLY the main product/item name. Ignore descriptive adjectives unless part of the product name.
-2. "woollen gloves" → ["gloves"] (not ["woollen", "gloves"])
-3. "red iPhone" → ["iPhone"] (not ["red", "iPhone"])
-4. "used laptop" → ["laptop"] (not ["used", "laptop"])
-5. Only include adjectives if essential: "iPhone 15" → ["iPhone", "15"]
-6. CORRECT COMMON TYPOS: "tenis" → "tennis", "rakcet" → "racket", "laptp" → "laptop"
-
-CONDITION EXTRACTION:
-- "new" → condition: "new"
-- "used" or "second-hand" → condition: "good" or "fair" (infer from context)
-- "like new" or "almost new" → condition: "like_new"
-- "good condition" → condition: "good"
-- "fair condition" → condition: "fair"
-- "poor condition" → condition: "poor"
-
-PRICE EXTRACTION:
-- "under 50" or "below 50" or "less than 50" → max_price: 50
-- "over 100" or "above 100" or "more than 100" → min_price: 100
-- "between 20 and 50" → min_price: 20, max_price: 50
-- "$50" or "50 dollars" → max_price: 50 (if context suggests upper limit)
-
-Return only valid JSON, no additional text."""
-
-    # Build context-aware prompt
-    context_info = ""
-    if context:
-        context_keywords = context.get("keywords", [])
-        context_category = context.get("category")
-        context_condition = context.get("condition")
-        context_min_price = context.get("min_price")
-        context_max_price = context.get("max_price")
-        
-        context_parts = []
-        if context_keywords:
-            context_parts.append(f"Previous search was for: {', '.join(context_keywords)}")
-        if context_category:
-            context_parts.append(f"Category: {context_category}")
-        if context_condition:
-            context_parts.append(f"Condition: {context_condition}")
-        if context_min_price or context_max_price:
-            price_range = []
-            if context_min_price:
-                price_range.append(f"min: ${context_min_price}")
-            if context_max_price:
-                price_range.append(f"max: ${context_max_price}")
-            context_parts.append(f"Price: {', '.join(price_range)}")
-        
-        if context_parts:
-            context_info = f"\n\nCONTEXT (previous search): {'; '.join(context_parts)}\nIf the user query refers to 'ones', 'those', 'them', 'it', etc., apply the new filters to the previous search criteria."
-    
-    user_prompt = f"User query: {merged_query}{context_info}\n\nExtract search criteria:"
-    
-    try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3,  # Lower temperature for more consistent extraction
-            max_tokens=200
-        )
-        
-        content = response.choices[0].message.content.strip()
-        
-        # Try to parse JSON response
-        try:
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            criteria = json.loads(content)
-            
-            # Handle query_type to determine if this is a product or category query
-            query_type = criteria.get("query_type", "product")
-            extracted_category = criteria.get("category")
-            
-            # Additional check: if the query contains a category name, extract it and treat as category query if appropriate
-            # This handles cases like "electronics", "textbooks", "show all sports equipment" where ChatGPT might not recognize it correctly
-            query_lower_check = merged_query.lower().strip()
-            
-            # Check if query contains "show all" or "all" with a category
-            if "show all" in query_lower_check or query_lower_check.startswith("all "):
-                # Try to extract category from the query (e.g., "show all sports equipment" -> "sports equipment")
-                # Remove "show all" or "all" and check what remains
-                remaining_query = query_lower_check.replace("show all", "").replace("all ", "").strip()
-                mapped_category = map_category_name_to_enum(remaining_query)
-                if mapped_category:
-                    query_type = "category"
-                    criteria["category"] = mapped_category
-                    criteria["keywords"] = []
-                    logger.info(f"Query '{query_lower_check}' contains 'show all/all' with category '{mapped_category}', treating as category query")
-            
-            # Also check if the query is exactly a category name
-            mapped_category = map_category_name_to_enum(query_lower_check)
-            if mapped_category and not query_type == "category":
-                # Query maps to a category name - check if it's exactly the category (not a product in that category)
-                # If the query is just the category name (1-2 words), treat as category query
-                query_words = query_lower_check.split()
-                if len(query_words) <= 2 and mapped_category == extracted_category:
-                    # Query is exactly a category name, treat as category query
-                    query_type = "category"
-                    criteria["category"] = mapped_category
-                    criteria["keywords"] = []
-                    logger.info(f"Query '{query_lower_check}' is exactly category name '{mapped_category}', treating as category query")
-                elif extracted_category and mapped_category == extracted_category and len(query_words) <= 3:
-                    # Query maps to category and is short, likely a category query
-                    query_type = "category"
-                    criteria["keywords"] = []
-                    logger.info(f"Query '{query_lower_check}' maps to category '{mapped_category}', treating as category query")
-            
-            # If query_type is "category", ensure keywords are empty
-            if query_type == "category":
-                criteria["keywords"] = []
-                logger.info(f"Category query detected, clearing keywords")
-            # If query_type is "both", keep both keywords and category
-            elif query_type == "both":
-                logger.info(f"Combined query detected, keeping both keywords and category")
-            # If query_type is "product" or not specified, keep keywords as is
-            
-            # Filter out common stop words and focus on product names (only for product queries)
-            raw_keywords = criteria.get("keywords", [])
-            filtered_keywords = []
-            
-            if query_type != "category" and raw_keywords:
-                stop_words = {
-                    "a", "an", "the", "i", "want", "need", "looking", "for", "under", "over", 
-                    "above", "below", "less", "more", "than", "dollars", "dollar", "$", 
-                    "woollen", "woolen", "wool", "used", "new", "old", "red", "blue", "green",
-                    "black", "white", "small", "large", "big", "little"
-                }
-                # Remove stop words, correct typos, and keep only meaningful product-related keywords
-                filtered_keywords = [
-                    correct_common_typos(kw.lower().strip())
-                    for kw in raw_keywords 
-                    if kw.lower().strip() not in stop_words and len(kw.strip()) > 2
-                ]
-            
-            # Prioritize: If we have multiple keywords, prefer the product name over descriptive words
-            # For "woollen gloves", we want ["gloves"] not ["woollen", "gloves"]
-            if len(filtered_keywords) > 1:
-                # Common product/item words that should be prioritized
-                product_keywords = {"gloves", "laptop", "phone", "iphone", "textbook", "book", 
-                                   "racket", "rackets", "tennis", "shoes", "bag", "backpack", "chair", 
-                                   "table", "desk", "bike", "bicycle", "car", "calculator"}
-                
-                # Check if any keyword is a known product name
-                product_matches = [kw for kw in filtered_keywords if kw in product_keywords]
-                
-                if product_matches:
-                    # Prioritize longer/more specific product names (e.g., "rackets" over "tennis")
-                    product_matches.sort(key=len, reverse=True)
-                    filtered_keywords = [product_matches[0]]
-                    logger.info(f"Multiple keywords detected, using product keyword: {filtered_keywords}")
-                else:
-                    # If no known product, use the longest keyword
-                    filtered_keywords.sort(key=len, reverse=True)
-                    filtered_keywords = [filtered_keywords[0]]
-                    logger.info(f"Multiple keywords detected, using longest keyword: {filtered_keywords}")
-            
-            # If we have filtered keywords, use them; otherwise use original
-            # For category queries, keywords should already be empty from query_type handling above
-            final_keywords = filtered_keywords if filtered_keywords else raw_keywords
-            
-            # Additional check: if query_type is "category", ensure keywords are empty
-            if query_type == "category":
-                final_keywords = []
-            
-            # Check if this is an "all [filter]" query - if so, clear keywords to return all matching items
-            query_lower = merged_query.lower()
-            extracted_category = criteria.get("category")
-            has_price_filter = criteria.get("min_price") or criteria.get("max_price")
-            has_condition_filter = criteria.get("condition")
-            
-            # Detect "all" queries: "all products", "show all", "all [category]", "all [condition]", "all [price range]"
-            is_all_query_explicit = (
-                "show all" in query_lower or 
-                query_lower.startswith("all ") or 
-                "all " in query_lower or
-                "all products" in query_lower or
-                "all items" in query_lower
-            )
-            
-            # Also treat category-only queries (e.g., "sports equipment", "electronics") as "all" queries
-            # If category is extracted and query contains generic category words, treat as category-only
-            # Also check if the query is exactly a category name
-            is_category_only = False
-            if extracted_category:
-                # Check if query is exactly the category name
-                mapped_category = map_category_name_to_enum(query_lower.strip())
-                if mapped_category == extracted_category:
-                    is_category_only = True
-                    logger.info(f"Query '{query_lower}' is exactly category name '{extracted_category}', treating as category query")
-                elif (
-                    is_all_query_explicit or
-                    any(term in query_lower for term in ["equipment", "items", "products", "stuff", "things"]) or
-                    (len(query_lower.split()) <= 3 and any(cat_term in query_lower for cat_term in ["sports", "fitness", "electronics", "textbook", "clothing", "furniture"]))
-                ):
-                    is_category_only = True
-            
-            if (is_all_query_explicit and (extracted_category or has_price_filter or has_condition_filter)) or is_category_only or query_type == "category":
-                # "All" query with filters or category-only query - clear keywords to return all items matching the filters
-                final_keywords = []
-                logger.info(f"'All' query or category-only query detected (category: {extracted_category}, price: {has_price_filter}, condition: {has_condition_filter}, query_type: {query_type}), clearing keywords")
-            
-            # Merge with context: use new values if provided, otherwise keep context values
-            # Also try to map category name to enum value
-            raw_category = criteria.get("category")
-            if raw_category:
-                # Try to map natural language to category enum
-                mapped_category = map_category_name_to_enum(raw_category)
-                if mapped_category and mapped_category in categories:
-                    merged_category = mapped_category
-                elif raw_category in categories:
-                    merged_category = raw_category
-                else:
-                    merged_category = context.get("category") if context else None
-            else:
-                merged_category = context.get("category") if context else None
-            merged_condition = criteria.get("condition") if criteria.get("condition") in conditions else (context.get("condition") if context else None)
-            merged_min_price = float(criteria["min_price"]) if criteria.get("min_price") else (context.get("min_price") if context else None)
-            merged_max_price = float(criteria["max_price"]) if criteria.get("max_price") else (context.get("max_price") if context else None)
-            
-            # For keywords: if new query has keywords, use them; otherwise use context keywords
-            # But if query has reference words, merge context keywords
-            # Also check if this is an "all [filter]" query or category-only query
-            query_lower_check = merged_query.lower()
-            has_price_filter = merged_min_price or merged_max_price
-            has_condition_filter = merged_condition is not None
-            
-            is_all_query_explicit = (
-                "show all" in query_lower_check or 
-                query_lower_check.startswith("all ") or 
-                "all " in query_lower_check or
-                "all products" in query_lower_check or 
-                "all items" in query_lower_check
-            )
-            
-            # Also treat category-only queries (e.g., "sports equipment", "electronics") as "all" queries
-            is_category_only_query = merged_category and (
-                is_all_query_explicit or
-                # Check if query is primarily about the category
-                any(term in query_lower_check for term in ["equipment", "items", "products", "stuff", "things"]) or
-                # If query is just the category name or category + generic words (max 3 words)
-                (len(query_lower_check.split()) <= 3 and any(cat_term in query_lower_check for cat_term in ["sports", "fitness", "electronics", "textbook", "clothing", "furniture"]))
-            )
-            
-            is_all_query_with_filters = (
-                (is_all_query_explicit and (merged_category or has_price_filter or has_condition_filter)) or
-                is_category_only_query
-            )
-            
-            reference_words = {"ones", "those", "them", "it", "these", "that", "this"}
-            query_lower = user_query.lower()
-            has_reference = any(ref in query_lower for ref in reference_words)
-            
-            if is_all_query_with_filters:
-                # "All" query with filters - clear keywords to return all items matching the filters
-                merged_keywords = []
-                logger.info(f"'All' query with filters detected (category: {merged_category}, price: {has_price_filter}, condition: {has_condition_filter}), clearing keywords")
-            elif has_reference and context and context.get("keywords"):
-                # User is referring to previous search, use context keywords
-                merged_keywords = context.get("keywords", final_keywords)
+
+def embed_query(text: str) -> np.ndarray:
+    """Embed a search query as a unit vector, reusing the embedding for repeated queries in this worker"""
+    return _embed_query_normalized(text.strip().lower())
+
+
+def _embedding_key(text: str) -> bytes:
+    return hashlib.sha256(f"{EMBEDDING_MODEL}:{EMBEDDING_DIMENSIONS}\0{text}".encode()).digest()
+
+
+def _create_embeddings(client: OpenAI, texts: List[str]) -> List[List[float]]:
+    """Embed texts in order, one API call per batch, with batches sent concurrently"""
+    def embed_batch(batch: List[str]):
+        response = client.embeddings.create(model=EMBEDDING_MODEL, input=batch, dimensions=EMBEDDING_DIMENSIONS)
+        return [data.embedding for data in response.data]
+
+    batches = [texts[i:i + ITEM_EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), ITEM_EMBEDDING_BATCH_SIZE)]
+    if len(batches) == 1:
+        return embed_batch(batches[0])
+    return [embedding for batch in _item_embedding_executor.map(embed_batch, batches) for embedding in batch]
+
+
+def _embed_items(client: OpenAI, items: List[Dict]) -> List[np.ndarray]:
+    """Embed items (title + description), only calling the API for items not already cached"""
+    texts = [f"{item.get('title', '')} {item.get('description', '')}" for item in items]
+    keys = [_embedding_key(text) for text in texts]
+
+    embeddings: List[Optional[np.ndarray]] = [None] * len(items)
+    missing: Dict[bytes, List[int]] = {}
+    with _item_embedding_cache_lock:
+        for i, key in enumerate(keys):
+            cached = _item_embedding_cache.get(key)
+            if cached is None:
+                missing.setdefault(key, []).append(i)
             else:
-                # Use new keywords if available, otherwise context keywords
-                merged_keywords = final_keywords if final_keywords else (context.get("keywords", []) if context else [])
-            
-            # Validate and clean criteria
-            validated_criteria = {
-                "keywords": merged_keywords,
-                "category": merged_category,
-                "condition": merged_condition,
-                "min_price": merged_min_price,
-                "max_price": merged_max_price,
-                "description": criteria.get("description", merged_query)
-            }
-            
-            logger.info(f"Extracted search criteria: {validated_criteria}")
-            return validated_criteria
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse OpenAI response as JSON: {e}")
-            logger.error(f"Response content: {content}")
-            # Fallback to basic keyword extraction with stop word filtering
-            stop_words = {"a", "an", "the", "i", "want", "need", "looking", "for", "under", "over", "above", "below", "less", "more", "than", "dollars", "dollar", "$", "woollen", "woolen", "wool"}
-        # Note: "used", "new", "old" are NOT in stop_words - they are conditions that should be extracted
-            keywords = [correct_common_typos(kw.lower().strip()) for kw in user_query.split() if kw.lower().strip() not in stop_words and len(kw.strip()) > 2]
-            
-            # If multiple keywords, prefer product names
-            if len(keywords) > 1:
-                product_keywords = {"gloves", "laptop", "phone", "iphone", "textbook", "book", 
-                                   "racket", "rackets", "tennis", "shoes", "bag", "backpack", "chair", 
-                                   "table", "desk", "bike", "bicycle", "car", "calculator"}
-                product_matches = [kw for kw in keywords if kw in product_keywords]
-                if product_matches:
-                    # Prioritize longer/more specific product names
-                    product_matches.sort(key=len, reverse=True)
-                    keywords = [product_matches[0]]
-            
-            # Extract price and condition
-            min_price, max_price, condition = extract_price_and_condition(user_query)
-            
-            return {
-                "keywords": keywords if keywords else user_query.split(),
-                "category": None,
-                "condition": condition,
-                "min_price": min_price,
-                "max_price": max_price,
-                "description": user_query
-            }
-            
-    except Exception as e:
-        logger.error(f"Error calling OpenAI API: {e}")
-        # Fallback to basic keyword extraction with stop word filtering
-        stop_words = {"a", "an", "the", "i", "want", "need", "looking", "for", "under", "over", "above", "below", "less", "more", "than", "dollars", "dollar", "$", "woollen", "woolen", "wool"}
-        # Note: "used", "new", "old" are NOT in stop_words - they are conditions that should be extracted
-        keywords = [correct_common_typos(kw.lower().strip()) for kw in user_query.split() if kw.lower().strip() not in stop_words and len(kw.strip()) > 2]
-        
-        # If multiple keywords, prefer product names
-        if len(keywords) > 1:
-            product_keywords = {"gloves", "laptop", "phone", "iphone", "textbook", "book", 
-                               "racket", "rackets", "tennis", "shoes", "bag", "backpack", "chair", 
-                               "table", "desk", "bike", "bicycle", "car", "calculator"}
-            product_matches = [kw for kw in keywords if kw in product_keywords]
-            if product_matches:
-                keywords = [product_matches[0]]
-        
-        # Extract price and condition
-        min_price, max_price, condition = extract_price_and_condition(user_query)
-        
-        return {
-            "keywords": keywords if keywords else user_query.split(),  # Fallback to all words if filtering removes everything
-            "category": None,
-            "condition": condition,
-            "min_price": min_price,
-            "max_price": max_price,
-            "description": user_query
-        }
+                _item_embedding_cache.move_to_end(key)
+                embeddings[i] = cached
+
+    if missing:
+        # One API input per distinct text, even when several items share it
+        new_embeddings = _create_embeddings(client, [texts[positions[0]] for positions in missing.values()])
+        with _item_embedding_cache_lock:
+            for (key, positions), embedding in zip(missing.items(), new_embeddings):
+                vector = _unit_vector(embedding).astype(np.float16)
+                vector.setflags(write=False)  # Shared between callers via the cache
+                for i in positions:
+                    embeddings[i] = vector
+                _item_embedding_cache[key] = vector
+                _item_embedding_cache.move_to_end(key)
+            while len(_item_embedding_cache) > ITEM_EMBEDDING_CACHE_SIZE:
+                _item_embedding_cache.popitem(last=False)
+
+    return embeddings
+
+
+def clear_semantic_caches() -> None:
+    """Drop all cached query and item embeddings for this worker"""
+    _embed_query_normalized.cache_clear()
+    with _item_embedding_cache_lock:
+        _item_embedding_cache.clear()
 
 
 def find_similar_items_by_semantics(
@@ -1308,47 +1254,27 @@ def find_similar_items_by_semantics(
         return []
     
     client = get_openai_client()
-    if not client:
-        # Client creation failed - return empty
+    if not client or not items or top_k <= 0:
+        # Client creation failed or nothing to rank - return empty
         return []
     
     try:
-        # Generate embedding for user query
-        query_embedding_response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=user_query
-        )
-        query_embedding = query_embedding_response.data[0].embedding
-        
-        # Generate embeddings for all items (description + title)
-        item_texts = [
-            f"{item.get('title', '')} {item.get('description', '')}" 
-            for item in items
-        ]
-        
-        item_embeddings_response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=item_texts
-        )
-        item_embeddings = [data.embedding for data in item_embeddings_response.data]
-        
-        # Calculate cosine similarity
-        import numpy as np
+        # Generate embedding for user query (cached per normalized query text)
+        query_vec = embed_query(user_query)
         
-        query_vec = np.array(query_embedding)
-        similarities = []
+        # Generate embeddings for all items (description + title), cached per content hash
+        item_matrix = np.vstack(_embed_items(client, items), dtype=np.float32)
         
-        for i, item_embedding in enumerate(item_embeddings):
-            item_vec = np.array(item_embedding)
-            # Cosine similarity
-            similarity = np.dot(query_vec, item_vec) / (np.linalg.norm(query_vec) * np.linalg.norm(item_vec))
-            similarities.append((i, similarity))
+        # Query and item embeddings are cached L2-normalized, so one matrix-vector product is the cosine similarity
+        similarities = item_matrix @ query_vec
         
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        # Select the top_k without sorting everything, then order just those (descending)
+        k = min(top_k, len(items))
+        top_indices = np.argpartition(-similarities, k - 1)[:k] if k < len(items) else np.arange(len(items))
+        top_indices = top_indices[np.argsort(-similarities[top_indices], kind="stable")]
         
         # Return top_k most similar items
-        top_items = [items[idx] for idx, _ in similarities[:top_k]]
+        top_items = [items[idx] for idx in top_indices]
         
         logger.info(f"Found {len(top_items)} semantically similar items")
         return top_items
@@ -1356,4 +1282,3 @@ def find_similar_items_by_semantics(
     except Exception as e:
         logger.error(f"Error in semantic search: {e}")
         return items[:top_k]
-
@@ -2,21 +2,90 @@
 Email utility for sending verification codes
 """
 
+import queue
+import secrets
 import smtplib
-import random
 import string
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
 from ..config import settings
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+_VERIFICATION_EMAIL_TEMPLATE = string.Template("""
+        <html>
+          <body>
+            <h2>Email Verification</h2>
+            <p>Thank you for signing up for Campus Marketplace!</p>
+            <p>Your verification code is: <strong style="font-size: 24px; color: #2563eb;">$code</strong></p>
+            <p>This code will expire in 10 minutes.</p>
+            <p>If you didn't request this code, please ignore this email.</p>
+            <hr>
+            <p style="color: #666; font-size: 12px;">Campus Marketplace Team</p>
+          </body>
+        </html>
+        """)
+
+# Idle, already authenticated SMTP connections, so a burst of signups pays the
+# connect + STARTTLS + LOGIN handshake once per connection rather than once per email
+SMTP_POOL_SIZE = 4
+_idle_smtp_connections: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue(maxsize=SMTP_POOL_SIZE)
+
+
+def _open_smtp(smtp_host: str, smtp_port: int, smtp_user: str, smtp_password: str) -> smtplib.SMTP:
+    server = smtplib.SMTP(smtp_host, smtp_port)
+    try:
+        server.starttls()
+        server.login(smtp_user, smtp_password)
+    except BaseException:
+        server.close()
+        raise
+    return server
+
+
+def _release_smtp(server: smtplib.SMTP) -> None:
+    """Keep a healthy connection for the next email, or close it if the pool is full"""
+    try:
+        _idle_smtp_connections.put_nowait(server)
+    except queue.Full:
+        try:
+            server.quit()
+        except smtplib.SMTPException:
+            server.close()
+
+
+def _send_message(msg: MIMEMultipart, smtp_host: str, smtp_port: int, smtp_user: str, smtp_password: str) -> None:
+    """Send over a pooled connection, reconnecting if the server dropped it while idle"""
+    try:
+        server = _idle_smtp_connections.get_nowait()
+    except queue.Empty:
+        server = None
+
+    if server is not None:
+        try:
+            server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            server.close()  # Idle timeout on the server side; fall through to a fresh connection
+        except BaseException:
+            server.close()
+            raise
+        else:
+            _release_smtp(server)
+            return
+
+    server = _open_smtp(smtp_host, smtp_port, smtp_user, smtp_password)
+    try:
+        server.send_message(msg)
+    except BaseException:
+        server.close()
+        raise
+    _release_smtp(server)
+
 
 def generate_verification_code(length: int = 6) -> str:
-    """Generate a random numeric verification code"""
-    return ''.join(random.choices(string.digits, k=length))
+    """Generate a random numeric verification code from the OS CSPRNG"""
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
 
 
 def send_verification_email(email: str, code: str) -> bool:
@@ -55,28 +124,13 @@ def send_verification_email(email: str, code: str) -> bool:
         msg['Subject'] = "Email Verification Code - Campus Marketplace"
         
         # Email body
-        body = f"""
-        <html>
-          <body>
-            <h2>Email Verification</h2>
-            <p>Thank you for signing up for Campus Marketplace!</p>
-            <p>Your verification code is: <strong style="font-size: 24px; color: #2563eb;">{code}</strong></p>
-            <p>This code will expire in 10 minutes.</p>
-            <p>If you didn't request this code, please ignore this email.</p>
-            <hr>
-            <p style="color: #666; font-size: 12px;">Campus Marketplace Team</p>
-          </body>
-        </html>
-        """
+        body = _VERIFICATION_EMAIL_TEMPLATE.substitute(code=code)
         
         msg.attach(MIMEText(body, 'html'))
         
         # Send email
         try:
-            with smtplib.SMTP(smtp_host, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
+            _send_message(msg, smtp_host, smtp_port, smtp_user, smtp_password)
             
             logger.info(f"Verification email sent successfully to {email}")
             return True
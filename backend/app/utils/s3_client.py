@@ -2,17 +2,53 @@
 AWS S3 client for file uploads and management
 """
 
+import functools
+import os
+import re
 import boto3
-import magic
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 from fastapi import HTTPException, UploadFile
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from typing import Iterable, Optional
 import uuid
 import logging
+from urllib.parse import urlsplit, urlunsplit
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+_REPEATED_SLASHES_RE = re.compile(r"/{2,}")
+
+
+def _join_url(base_url: str, key: str) -> str:
+    """Append an S3 key to a base URL, collapsing repeated slashes in the path only"""
+    parts = urlsplit(f"{base_url}/{key}")
+    return urlunsplit(parts._replace(path=_REPEATED_SLASHES_RE.sub("/", parts.path)))
+
+
+# One client is shared by every request, so its pool must cover concurrent uploads (each multipart
+# transfer can hold several connections); keep-alive avoids a TCP/TLS handshake per request
+_BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=30
+)
+
+# Uploads stream from the spooled UploadFile in parts instead of being read into memory first;
+# anything above the threshold goes multipart with parts sent concurrently
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    use_threads=True
+)
+
 
 class S3Client:
     def __init__(self):
@@ -22,9 +58,12 @@ class S3Client:
                 's3',
                 aws_access_key_id=settings.aws_access_key_id,
                 aws_secret_access_key=settings.aws_secret_access_key,
-                region_name=settings.aws_region
+                region_name=settings.aws_region,
+                config=_BOTO_CONFIG
             )
             self.bucket_name = settings.s3_bucket_name
+            # Whether the bucket accepts object ACLs; None until the first upload finds out
+            self._acl_supported: Optional[bool] = None
             self.region = settings.aws_region
             
             # Construct proper S3 URL if base_url is not a valid S3 URL
@@ -57,10 +96,11 @@ class S3Client:
             str: Full S3 URL of uploaded file
         """
         try:
-            # Validate file size
-            file_size = 0
-            content = await file.read()
-            file_size = len(content)
+            # Validate file size without reading the upload into memory
+            file_size = file.size
+            if file_size is None:
+                file_size = file.file.seek(0, os.SEEK_END)
+                file.file.seek(0)
             
             if file_size > settings.max_upload_size:
                 raise HTTPException(
@@ -88,37 +128,15 @@ class S3Client:
             # S3 key (path)
             s3_key = f"{folder}/{filename}"
             
-            # Upload to S3
-            # Try with public-read ACL first, fall back to without ACL if bucket has ACLs disabled
-            try:
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    Body=content,
-                    ContentType=file.content_type or "application/octet-stream",
-                    ContentDisposition="inline",
-                    ACL='public-read'  # Make file publicly readable
-                )
-            except ClientError as acl_error:
-                # If ACL fails (bucket has ACLs disabled), upload without ACL
-                # Bucket must be configured with public access via bucket policy instead
-                logger.warning(f"Failed to upload with ACL, retrying without: {acl_error}")
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    Body=content,
-                    ContentType=file.content_type or "application/octet-stream",
-                    ContentDisposition="inline"
-                )
+            # Upload to S3 off the event loop, so other requests are served during the transfer
+            await run_in_threadpool(self._put_file, file.file, s3_key, file.content_type)
             
             # Return full S3 URL (ensure proper format)
-            s3_url = f"{self.base_url}/{s3_key}"
-            # Ensure URL doesn't have double slashes
-            s3_url = s3_url.replace("//", "/").replace("https:/", "https://").replace("http:/", "http://")
+            s3_url = _join_url(self.base_url, s3_key)
             logger.debug(f"Generated S3 URL: {s3_url}")
             return s3_url
             
-        except ClientError as e:
+        except (ClientError, S3UploadFailedError) as e:
             logger.error(f"S3 upload error: {e}")
             raise HTTPException(status_code=500, detail="Failed to upload file to S3")
         except NoCredentialsError:
@@ -130,6 +148,45 @@ class S3Client:
         finally:
             await file.seek(0)  # Reset file pointer
 
+    def _put_file(self, fileobj, s3_key: str, content_type: Optional[str]) -> None:
+        """Blocking upload of a file object; runs in the threadpool"""
+        extra_args = {
+            "ContentType": content_type or "application/octet-stream",
+            "ContentDisposition": "inline",
+        }
+        if self._acl_supported is False:
+            # Bucket has ACLs disabled; public access comes from the bucket policy
+            self.s3_client.upload_fileobj(fileobj, self.bucket_name, s3_key, ExtraArgs=extra_args, Config=_TRANSFER_CONFIG)
+            return
+
+        # Try with public-read ACL first, fall back to without ACL if bucket has ACLs disabled
+        try:
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={**extra_args, "ACL": "public-read"},  # Make file publicly readable
+                Config=_TRANSFER_CONFIG
+            )
+            self._acl_supported = True
+        except (ClientError, S3UploadFailedError) as acl_error:
+            if self._acl_supported:
+                # ACLs worked before, so this is a real upload failure
+                raise
+            # If ACL fails (bucket has ACLs disabled), upload without ACL
+            # Bucket must be configured with public access via bucket policy instead
+            logger.warning(f"Failed to upload with ACL, retrying without: {acl_error}")
+            fileobj.seek(0)
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args,
+                Config=_TRANSFER_CONFIG
+            )
+            # Only remembered once the plain upload succeeds, so a transient error can't switch ACLs off
+            self._acl_supported = False
+
     async def delete_file(self, s3_url: str) -> bool:
         """
         Delete file from S3 bucket
@@ -161,7 +218,8 @@ class S3Client:
                 if s3_key.startswith('uploads/'):
                     s3_key = s3_key[8:]  # Remove 'uploads/' prefix
             
-            self.s3_client.delete_object(
+            await run_in_threadpool(
+                self.s3_client.delete_object,
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
@@ -226,33 +284,47 @@ class S3Client:
             s3_key = s3_key[8:]  # Remove 'uploads/' prefix
         
         # Construct full S3 URL
-        s3_url = f"{self.base_url}/{s3_key}"
-        # Ensure proper URL format
-        s3_url = s3_url.replace("//", "/").replace("https:/", "https://").replace("http:/", "http://")
-        return s3_url
-
+        return _join_url(self.base_url, s3_key)
 
-# Global S3 client instance (lazy initialization)
-_s3_client_instance = None
 
+@functools.lru_cache(maxsize=1)
 def get_s3_client() -> S3Client:
-    """Get or create S3 client instance (lazy initialization)"""
-    global _s3_client_instance
-    if _s3_client_instance is None:
-        try:
-            _s3_client_instance = S3Client()
-        except Exception as e:
-            logger.warning(f"S3 client initialization failed: {e}. File uploads will not work until S3 is configured.")
-            # Create a dummy client that will raise errors when used
-            class DummyS3Client:
-                async def upload_file(self, *args, **kwargs):
-                    raise HTTPException(status_code=500, detail="S3 is not configured. Please configure AWS S3 credentials.")
-                async def delete_file(self, *args, **kwargs):
-                    raise HTTPException(status_code=500, detail="S3 is not configured. Please configure AWS S3 credentials.")
-                def generate_presigned_url(self, *args, **kwargs):
-                    raise HTTPException(status_code=500, detail="S3 is not configured. Please configure AWS S3 credentials.")
-            _s3_client_instance = DummyS3Client()
-    return _s3_client_instance
+    """Get or create S3 client instance (lazy initialization, cached for the process)"""
+    try:
+        return S3Client()
+    except Exception as e:
+        logger.warning(f"S3 client initialization failed: {e}. File uploads will not work until S3 is configured.")
+        # Create a dummy client that will raise errors when used
+        class DummyS3Client:
+            async def upload_file(self, *args, **kwargs):
+                raise HTTPException(status_code=500, detail="S3 is not configured. Please configure AWS S3 credentials.")
+            async def delete_file(self, *args, **kwargs):
+                raise HTTPException(status_code=500, detail="S3 is not configured. Please configure AWS S3 credentials.")
+            def generate_presigned_url(self, *args, **kwargs):
+                raise HTTPException(status_code=500, detail="S3 is not configured. Please configure AWS S3 credentials.")
+            def get_s3_url(self, file_path: str) -> str:
+                # Without S3 there is nothing to normalize against; keep the original URL
+                return file_path
+        return DummyS3Client()
+
+
+def normalize_s3_urls(objects: Iterable, field: str):
+    """
+    Rewrite a URL attribute on a batch of objects to full S3 URLs in one pass.
+
+    ORM rows are updated with set_committed_value so the rewrite is never flushed back to the database.
+    """
+    s3 = get_s3_client()
+    for obj in objects:
+        url = getattr(obj, field, None)
+        if not url:
+            continue
+        normalized = s3.get_s3_url(url)
+        if inspect(obj, raiseerr=False) is not None:
+            set_committed_value(obj, field, normalized)
+        else:
+            setattr(obj, field, normalized)
+    return objects
 
 # For backward compatibility, create a proxy object
 class S3ClientProxy:
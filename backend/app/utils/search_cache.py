@@ -0,0 +1,173 @@
+"""
+Redis-backed cache for AI search responses.
+Popular queries ("iphone", "textbook") skip the LLM call and DB queries for a short TTL.
+Near-duplicate phrasings ("used iphone" / "second hand iphone") can optionally be served
+from a per-worker cache keyed by query embedding similarity.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import orjson
+import redis
+
+from ..config import settings
+from .ai_search import embed_query, extract_price_and_condition
+from .semantic_cache import SemanticCache, l2_normalize
+
+logger = logging.getLogger(__name__)
+
+AI_SEARCH_CACHE_TTL_SECONDS = 60
+
+# Bumped on every item write so cached search results never outlive a catalog change
+GENERATION_KEY = "ai_search:generation"
+
+# Initialize Redis client lazily
+_redis_client = None
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Get Redis client instance, or None when caching is not configured
+    """
+    global _redis_client
+    if not settings.redis_url:
+        return None
+
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=0.5,  # Never let the cache slow a search down
+            socket_connect_timeout=0.5
+        )
+        logger.info("Initialized Redis client for AI search cache")
+
+    return _redis_client
+
+
+def make_cache_key(client: redis.Redis, query_text: str, context: Optional[Dict], use_semantic_search: bool) -> str:
+    """Build the cache key for a search, scoped to the current catalog generation"""
+    generation = client.get(GENERATION_KEY) or b"0"
+    payload = orjson.dumps([query_text, context, use_semantic_search], option=orjson.OPT_SORT_KEYS, default=str)
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return f"ai_search:{generation.decode()}:{digest}"
+
+
+def get_cached_search(query_text: str, context: Optional[Dict], use_semantic_search: bool):
+    """
+    Look up a cached AI search response.
+
+    Returns:
+        (cache_key, cached) where cached is {"content": str, "headers": dict} or None.
+        cache_key is None when caching is unavailable.
+    """
+    client = get_redis_client()
+    if client is None:
+        return None, None
+
+    try:
+        cache_key = make_cache_key(client, query_text, context, use_semantic_search)
+        cached = client.get(cache_key)
+    except redis.RedisError as e:
+        logger.warning(f"AI search cache lookup failed: {e}")
+        return None, None
+
+    return cache_key, json.loads(cached) if cached else None
+
+
+def set_cached_search(cache_key: Optional[str], content: str, headers: Dict[str, str]) -> None:
+    """Store an AI search response body and headers"""
+    client = get_redis_client()
+    if client is None or cache_key is None:
+        return
+
+    try:
+        client.set(
+            cache_key,
+            json.dumps({"content": content, "headers": headers}),
+            ex=AI_SEARCH_CACHE_TTL_SECONDS
+        )
+    except redis.RedisError as e:
+        logger.warning(f"AI search cache store failed: {e}")
+
+
+def invalidate_search_cache() -> None:
+    """Invalidate all cached AI search responses after an item changes"""
+    # The semantic cache is per worker: this only clears the worker handling the write,
+    # other workers keep serving their entries until SEMANTIC_CACHE_TTL_SECONDS expires them
+    _semantic_cache.clear()
+
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        client.incr(GENERATION_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"AI search cache invalidation failed: {e}")
+
+
+SEMANTIC_CACHE_THRESHOLD = 0.85
+SEMANTIC_CACHE_TTL_SECONDS = 300
+SEMANTIC_CACHE_SIZE = 10000
+
+
+# Per-worker, in-process cache: clear() and invalidation only reach the current worker
+_semantic_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL_SECONDS)
+
+
+def _semantic_scope(query_text: str, context: Optional[Dict], use_semantic_search: bool) -> str:
+    """
+    Requests only share cached results when their explicit filters agree.
+    Price and condition words in the query count as filters: "iphone under 50" and "iphone under 500"
+    (or "new desk" and "used desk") embed almost identically but must not share a response.
+    """
+    return orjson.dumps(
+        [extract_price_and_condition(query_text), context, use_semantic_search],
+        option=orjson.OPT_SORT_KEYS,
+        default=str
+    ).decode()
+
+
+def get_semantically_cached_search(query_text: str, context: Optional[Dict], use_semantic_search: bool):
+    """
+    Look up a cached response for a query phrased similarly to an earlier one.
+
+    Returns:
+        (vector, cached) where vector is the normalized query embedding to store under on a miss
+        (None when the semantic cache is disabled or embedding failed) and cached is
+        {"content": str, "headers": dict} or None.
+    """
+    if not settings.ai_search_semantic_cache or not settings.openai_api_key:
+        return None, None
+
+    try:
+        vector = l2_normalize(embed_query(query_text))
+    except Exception as e:
+        logger.warning(f"AI search semantic cache embedding failed: {e}")
+        return None, None
+    if vector is None:
+        return None, None
+
+    return vector, _semantic_cache.lookup(vector, _semantic_scope(query_text, context, use_semantic_search))
+
+
+def set_semantically_cached_search(
+    vector: Optional[np.ndarray],
+    query_text: str,
+    context: Optional[Dict],
+    use_semantic_search: bool,
+    content: str,
+    headers: Dict[str, str]
+) -> None:
+    """Store an AI search response under its query embedding"""
+    if vector is None:
+        return
+    _semantic_cache.store(
+        vector,
+        _semantic_scope(query_text, context, use_semantic_search),
+        {"content": content, "headers": headers}
+    )
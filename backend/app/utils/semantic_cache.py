@@ -0,0 +1,75 @@
+"""
+In-process cache keyed by embedding similarity.
+Lets near-duplicate phrasings of a query ("used iphone" / "second hand iphone") share a cached result.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+
+def l2_normalize(vector) -> Optional[np.ndarray]:
+    """Return the vector as unit-length float32, or None for a zero vector"""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return vector / norm
+
+
+class SemanticCache:
+    """
+    Fixed-capacity matrix of L2-normalized embeddings with their cached payloads.
+    A lookup is one matrix-vector product; entries are evicted least recently used.
+    """
+
+    def __init__(self, capacity: int, threshold: float, ttl_seconds: int):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # Allocated on first store, once the dimension is known
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # slot -> (scope, expires_at, payload)
+        self._free_slots = list(range(capacity - 1, -1, -1))
+
+    def lookup(self, vector: np.ndarray, scope: str) -> Optional[Any]:
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                return None
+
+            scores = self._vectors @ vector  # Free slots are zero rows and never pass the threshold
+            candidates = np.flatnonzero(scores >= self.threshold)
+            now = time.monotonic()
+            for slot in candidates[np.argsort(-scores[candidates])]:
+                slot = int(slot)
+                entry_scope, expires_at, payload = self._entries[slot]
+                if expires_at < now:
+                    self._release(slot)
+                    continue
+                if entry_scope == scope:
+                    self._entries.move_to_end(slot)
+                    return payload
+        return None
+
+    def store(self, vector: np.ndarray, scope: str, payload: Any) -> None:
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            if not self._free_slots:
+                self._release(next(iter(self._entries)))
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = (scope, time.monotonic() + self.ttl_seconds, payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in list(self._entries):
+                self._release(slot)
+
+    def _release(self, slot: int) -> None:
+        del self._entries[slot]
+        self._vectors[slot] = 0
+        self._free_slots.append(slot)
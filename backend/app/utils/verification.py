@@ -2,32 +2,56 @@
 Verification code storage and management
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Optional
 import threading
+import time
+from collections import OrderedDict
+from typing import Dict
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
 # In-memory storage for verification codes
-# Format: {email: {"code": str, "expires_at": datetime, "attempts": int, "verified": bool}}
-_verification_codes: Dict[str, Dict] = {}
+# Format: {email: {"code": str, "expires_at": float, "attempts": int, "verified": bool}}
+# Every entry in a dict shares one TTL, so keeping entries in insertion order keeps them in expiry order:
+# expired entries are always at the front and pruning never scans live ones
+_verification_codes: "OrderedDict[str, Dict]" = OrderedDict()
 # Track verified emails (separate from codes, so code can be reused for signup)
-_verified_emails: Dict[str, datetime] = {}
+_verified_emails: "OrderedDict[str, float]" = OrderedDict()
 _lock = threading.Lock()
 CODE_EXPIRY_MINUTES = 10
 MAX_ATTEMPTS = 5
 VERIFICATION_VALID_MINUTES = 30  # How long verification remains valid
+MAX_STORED_EMAILS = 100_000  # Oldest entries are dropped beyond this, so the dicts stay bounded
+
+
+def _prune(entries: OrderedDict, now: float, expires_at=lambda value: value) -> int:
+    """Drop expired (and over-capacity) entries from the front; caller holds _lock"""
+    removed = 0
+    while entries:
+        oldest = next(iter(entries.values()))
+        if len(entries) <= MAX_STORED_EMAILS and expires_at(oldest) > now:
+            break
+        entries.popitem(last=False)
+        removed += 1
+    return removed
+
+
+def _code_expires_at(verification_data: Dict) -> float:
+    return verification_data["expires_at"]
 
 
 def store_verification_code(email: str, code: str) -> None:
     """Store verification code with expiration"""
+    email_lower = email.lower()
+    now = time.monotonic()
     with _lock:
-        _verification_codes[email.lower()] = {
+        _verification_codes.pop(email_lower, None)  # Re-insert at the back to keep expiry order
+        _verification_codes[email_lower] = {
             "code": code,
-            "expires_at": datetime.utcnow() + timedelta(minutes=CODE_EXPIRY_MINUTES),
+            "expires_at": now + CODE_EXPIRY_MINUTES * 60,
             "attempts": 0
         }
+        _prune(_verification_codes, now, _code_expires_at)
         logger.info(f"Stored verification code for {email}")
 
 
@@ -39,16 +63,16 @@ def verify_code(email: str, code: str) -> bool:
         True if code is valid, False otherwise
     """
     email_lower = email.lower()
+    now = time.monotonic()
     
     with _lock:
-        if email_lower not in _verification_codes:
+        verification_data = _verification_codes.get(email_lower)
+        if verification_data is None:
             logger.warning(f"Verification code not found for {email}")
             return False
         
-        verification_data = _verification_codes[email_lower]
-        
         # Check if expired
-        if datetime.utcnow() > verification_data["expires_at"]:
+        if now > verification_data["expires_at"]:
             logger.warning(f"Verification code expired for {email}")
             del _verification_codes[email_lower]
             return False
@@ -66,7 +90,9 @@ def verify_code(email: str, code: str) -> bool:
         if verification_data["code"] == code:
             # Code is correct, mark as verified but don't delete yet (needed for signup)
             verification_data["verified"] = True
-            _verified_emails[email_lower] = datetime.utcnow() + timedelta(minutes=VERIFICATION_VALID_MINUTES)
+            _verified_emails.pop(email_lower, None)  # Re-insert at the back to keep expiry order
+            _verified_emails[email_lower] = now + VERIFICATION_VALID_MINUTES * 60
+            _prune(_verified_emails, now)
             logger.info(f"Verification code verified for {email} (code kept for signup)")
             return True
         else:
@@ -83,13 +109,13 @@ def is_email_verified(email: str) -> bool:
     """
     email_lower = email.lower()
     with _lock:
-        if email_lower in _verified_emails:
-            if datetime.utcnow() < _verified_emails[email_lower]:
-                return True
-            else:
-                # Verification expired
-                del _verified_emails[email_lower]
-                return False
+        expires_at = _verified_emails.get(email_lower)
+        if expires_at is None:
+            return False
+        if time.monotonic() < expires_at:
+            return True
+        # Verification expired
+        del _verified_emails[email_lower]
         return False
 
 
@@ -97,23 +123,17 @@ def remove_verification_code(email: str) -> None:
     """Remove verification code (after successful signup)"""
     with _lock:
         email_lower = email.lower()
-        if email_lower in _verification_codes:
-            del _verification_codes[email_lower]
-        if email_lower in _verified_emails:
-            del _verified_emails[email_lower]
+        _verification_codes.pop(email_lower, None)
+        _verified_emails.pop(email_lower, None)
         logger.info(f"Removed verification code for {email}")
 
 
 def cleanup_expired_codes() -> None:
-    """Remove expired verification codes (can be called periodically)"""
+    """Remove expired verification codes (can be called periodically; stores also prune as they go)"""
+    now = time.monotonic()
     with _lock:
-        now = datetime.utcnow()
-        expired_emails = [
-            email for email, data in _verification_codes.items()
-            if now > data["expires_at"]
-        ]
-        for email in expired_emails:
-            del _verification_codes[email]
-        if expired_emails:
-            logger.info(f"Cleaned up {len(expired_emails)} expired verification codes")
+        removed = _prune(_verification_codes, now, _code_expires_at)
+        _prune(_verified_emails, now)
+        if removed:
+            logger.info(f"Cleaned up {removed} expired verification codes")
 
@@ -49,7 +49,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Extracted-Criteria", "X-Filters-Relaxed", "X-Requested-Condition", "X-Requested-Price", "X-Requested-Category", "X-Extraction-Method"],
+    expose_headers=["X-Extracted-Criteria", "X-Filters-Relaxed", "X-Requested-Condition", "X-Requested-Price", "X-Requested-Category", "X-Extraction-Method", "X-Unread-Count"],
 )
 
 # Include routers
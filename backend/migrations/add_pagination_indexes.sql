@@ -0,0 +1,10 @@
+-- Migration: Add indexes backing keyset pagination
+-- Run this script on your PostgreSQL database
+
+-- Admin item listing: WHERE status = ? AND id > ? ORDER BY id
+CREATE INDEX IF NOT EXISTS ix_items_status_id
+ON items (status, id);
+
+-- Notification feed: WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS ix_notifications_user_created_at_id
+ON notifications (user_id, created_at DESC, id DESC);
@@ -0,0 +1,12 @@
+-- Migration: Add partial indexes over unread notifications
+-- Run this script on your PostgreSQL database
+
+-- Unread count and "mark all as read" for a user
+CREATE INDEX IF NOT EXISTS ix_notif_user_unread
+ON notifications (user_id, created_at DESC)
+WHERE is_read = false;
+
+-- "Mark conversation notifications as read"
+CREATE INDEX IF NOT EXISTS ix_notif_user_conv_unread
+ON notifications (user_id, related_conversation_id)
+WHERE is_read = false;
@@ -14,22 +14,15 @@ def run_migration():
     print("Running migration: Adding description and item_snapshot columns to item_reports...")
     
     try:
-        with engine.connect() as conn:
-            # Add description column
+        # A single ALTER is atomic on its own, so autocommit saves the separate COMMIT round-trip
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # Add description and item_snapshot (JSONB for PostgreSQL) columns in one statement
             conn.execute(text("""
-                ALTER TABLE item_reports 
-                ADD COLUMN IF NOT EXISTS description TEXT
-            """))
-            
-            # Add item_snapshot column (using JSONB for PostgreSQL)
-            conn.execute(text("""
-                ALTER TABLE item_reports 
+                ALTER TABLE item_reports
+                ADD COLUMN IF NOT EXISTS description TEXT,
                 ADD COLUMN IF NOT EXISTS item_snapshot JSONB
             """))
             
-            # Commit the changes
-            conn.commit()
-            
             print("✓ Successfully added 'description' column")
             print("✓ Successfully added 'item_snapshot' column")
             print("\nMigration completed successfully!")
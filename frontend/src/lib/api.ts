@@ -582,10 +582,19 @@ export async function sendMessage(data: MessageCreate): Promise<Message> {
 // Notifications API functions
 import { Notification } from '../types'
 
-export async function getNotifications(unreadOnly: boolean = false, skip: number = 0, limit: number = 50): Promise<Notification[]> {
+// Keyset cursor: the created_at and id of the last notification on the previous page
+export interface NotificationCursor {
+  createdAt: string
+  id: number
+}
+
+export async function getNotifications(unreadOnly: boolean = false, limit: number = 50, before?: NotificationCursor): Promise<Notification[]> {
   const params = new URLSearchParams()
   if (unreadOnly) params.append('unread_only', 'true')
-  params.append('skip', skip.toString())
+  if (before) {
+    params.append('before_created_at', before.createdAt)
+    params.append('before_id', before.id.toString())
+  }
   params.append('limit', limit.toString())
   return apiRequest<Notification[]>(`/api/notifications/?${params.toString()}`)
 }
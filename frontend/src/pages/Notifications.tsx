@@ -20,6 +20,8 @@ import Navbar from "@/components/Navbar";
 import { useNavigate, useLocation } from "react-router-dom";
 import { BrowserNotifications } from "@/lib/notifications";
 
+const NOTIFICATIONS_PAGE_SIZE = 100;
+
 const getNotificationIcon = (type: string) => {
   switch (type) {
     case "message":
@@ -39,6 +41,15 @@ export default function Notifications() {
   const queryClient = useQueryClient();
   const [filter, setFilter] = useState<"all" | "unread">("all");
   const [now, setNow] = useState(Date.now());
+  // Pages fetched with "Load older", appended below the live first page
+  const [olderNotifications, setOlderNotifications] = useState<Notification[]>([]);
+  const [hasOlder, setHasOlder] = useState(true);
+  const [loadingOlder, setLoadingOlder] = useState(false);
+
+  useEffect(() => {
+    setOlderNotifications([]);
+    setHasOlder(true);
+  }, [filter]);
 
   // Request notification permission on mount
   useEffect(() => {
@@ -55,9 +66,9 @@ export default function Notifications() {
   }, []);
 
   // Get notifications
-  const { data: notifications, isLoading } = useQuery({
+  const { data: notificationsPage, isLoading } = useQuery({
     queryKey: ["notifications", filter],
-    queryFn: () => getNotifications(filter === "unread", 0, 100),
+    queryFn: () => getNotifications(filter === "unread", NOTIFICATIONS_PAGE_SIZE),
     refetchInterval: 2000, // Refetch every 2 seconds for instant updates
   });
 
@@ -165,11 +176,32 @@ export default function Notifications() {
     }
   };
 
+  const firstPage = notificationsPage || [];
+  const firstPageIds = new Set(firstPage.map((n) => n.id));
+  const notifications = [...firstPage, ...olderNotifications.filter((n) => !firstPageIds.has(n.id))];
+  const canLoadOlder = hasOlder && firstPage.length === NOTIFICATIONS_PAGE_SIZE;
+
+  const loadOlder = async () => {
+    const last = olderNotifications[olderNotifications.length - 1] ?? firstPage[firstPage.length - 1];
+    if (!last) return;
+    setLoadingOlder(true);
+    try {
+      const page = await getNotifications(filter === "unread", NOTIFICATIONS_PAGE_SIZE, {
+        createdAt: last.created_at,
+        id: last.id,
+      });
+      setOlderNotifications((old) => [...old, ...page]);
+      setHasOlder(page.length === NOTIFICATIONS_PAGE_SIZE);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const unreadCount = unreadCountData?.unread_count || 0;
-  const unreadNotifications = notifications?.filter((n) => !n.is_read) || [];
+  const unreadNotifications = notifications.filter((n) => !n.is_read);
 
   // Group notifications by sender (related_user_id) for message notifications
-  const groupedNotifications = notifications?.reduce((acc, notification) => {
+  const groupedNotifications = notifications.reduce((acc, notification) => {
     if (notification.type === "message" && notification.related_user_id) {
       const key = `user-${notification.related_user_id}`;
       if (!acc[key]) {
@@ -197,7 +229,7 @@ export default function Notifications() {
       };
     }
     return acc;
-  }, {} as Record<string, { notifications: Notification[]; count: number; latest: Notification; senderName: string | null }>) || {};
+  }, {} as Record<string, { notifications: Notification[]; count: number; latest: Notification; senderName: string | null }>);
 
   const displayNotifications = Object.values(groupedNotifications).sort((a, b) => 
     new Date(b.latest.created_at).getTime() - new Date(a.latest.created_at).getTime()
@@ -320,6 +352,13 @@ export default function Notifications() {
                     </div>
                   );
                 })}
+                {canLoadOlder && (
+                  <div className="p-4 text-center">
+                    <Button variant="outline" size="sm" onClick={loadOlder} disabled={loadingOlder}>
+                      {loadingOlder ? "Loading..." : "Load older notifications"}
+                    </Button>
+                  </div>
+                )}
               </div>
             ) : (
               <div className="p-6 text-center text-muted-foreground">